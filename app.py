@@ -1,16 +1,38 @@
 import os
+import base64
+import binascii
+import bisect
+import click
+import csv
+import io
 import jinja2
 import json
-import calendar
+import hashlib
+import mimetypes
+import queue
+import re
+import signal
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, redirect, url_for
+from flask import Flask, Response, abort, g, has_request_context, jsonify, render_template, request, redirect, send_from_directory, stream_with_context, url_for
+from markupsafe import Markup, escape
+from werkzeug.security import safe_join
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.exc import OperationalError
+from sqlalchemy import and_, case, collate, delete, event, func, insert, literal, or_, select, text, tuple_, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 # ==========================================
 # CONFIGURATION & SETUP
 # ==========================================
-app = Flask(__name__)
+# Static files are served by static_asset() below (hashed URLs, precompressed)
+app = Flask(__name__, static_folder=None)
 
 # Use SQLite for a simple, local file-based database
 # IMPORTANT: use current working directory so DB lives next to EXE when packaged
@@ -19,17 +41,62 @@ app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'ag
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = 'agency-secret-key-123'
 
+# SQLite connection profile, applied to every new connection (see
+# apply_sqlite_profile). 'performance' trades a little durability on power
+# loss (synchronous=NORMAL) for WAL's concurrent readers; 'safe' restores
+# SQLite's defaults.
+SQLITE_PROFILES = {
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,      # KiB when negative, i.e. 64 MB
+        'mmap_size': 268435456,    # 256 MB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,      # ms
+    },
+    'safe': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+}
+app.config['SQLITE_PROFILE'] = os.environ.get('AGENCY_SQLITE_PROFILE', 'performance')
+
+# Pool sized for a threaded server: one connection per worker thread, with
+# headroom for bursts. WAL lets those connections read while one writes.
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': int(os.environ.get('AGENCY_DB_POOL_SIZE', 10)),
+    'max_overflow': int(os.environ.get('AGENCY_DB_MAX_OVERFLOW', 20)),
+    'pool_timeout': 30,
+    'connect_args': {'timeout': 5},
+}
+
 db = SQLAlchemy(app)
 
+@event.listens_for(Engine, 'connect')
+def apply_sqlite_profile(dbapi_connection, connection_record):
+    """Apply the configured SQLITE_PROFILES pragmas to a new connection."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    pragmas = SQLITE_PROFILES.get(app.config['SQLITE_PROFILE'], {})
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 # ==========================================
 # DATABASE MODELS
 # ==========================================
 class Task(db.Model):
+    __table_args__ = (
+        db.Index('ix_task_completed_due', 'is_completed', 'due_date'),
+        db.Index('ix_task_category_due', 'category', 'is_completed', 'due_date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50), nullable=False)
-    due_date = db.Column(db.String(20), nullable=False)
-    is_completed = db.Column(db.Boolean, default=False)
+    due_date = db.Column(db.Date, nullable=False)
+    is_completed = db.Column(db.Boolean, nullable=False, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Financial(db.Model):
@@ -41,6 +108,9 @@ class Financial(db.Model):
 
 class Client(db.Model):
     """Model to store client details"""
+    __table_args__ = (
+        db.Index('ix_client_status', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     company = db.Column(db.String(100))
@@ -48,14 +118,83 @@ class Client(db.Model):
     status = db.Column(db.String(20), default='Lead') # Lead, Active, Churned
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class RevenueRollup(db.Model):
+    """Materialized Sale totals per (day or month, status).
+
+    Maintained by add_sale, bulk imports and bulk sale deletes in the same
+    transaction as the sales themselves; rebuild_revenue_rollup()
+    regenerates it from scratch.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('grain', 'status', 'period', name='uq_rollup_grain_status_period'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    grain = db.Column(db.String(5), nullable=False) # day, month
+    period = db.Column(db.String(10), nullable=False) # YYYY-MM-DD or YYYY-MM
+    status = db.Column(db.String(20), nullable=False)
+    amount = db.Column(db.Float, nullable=False, default=0)
+    deal_count = db.Column(db.Integer, nullable=False, default=0)
+
+class QuarantinedRow(db.Model):
+    """Rows a migration could not convert, kept verbatim for manual repair"""
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    row_id = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False) # JSON of the original row
+    reason = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Job(db.Model):
+    """Background job state, persisted so interrupted jobs resume on restart"""
+    __table_args__ = (
+        db.Index('ix_job_status', 'status'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    params = db.Column(db.Text, nullable=False, default='{}') # JSON keyword arguments
+    status = db.Column(db.String(10), nullable=False, default='queued') # queued, running, done, failed
+    progress = db.Column(db.Integer, nullable=False, default=0) # units done (rows, steps); resume point
+    total = db.Column(db.Integer) # units expected, NULL if unknown
+    message = db.Column(db.String(200))
+    result = db.Column(db.Text) # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': json.loads(self.params or '{}'),
+            'status': self.status,
+            'progress': self.progress,
+            'total': self.total,
+            'message': self.message,
+            'result': json.loads(self.result) if self.result else None,
+            'created_at': self.created_at.isoformat(timespec='seconds') if self.created_at else None,
+            'finished_at': self.finished_at.isoformat(timespec='seconds') if self.finished_at else None,
+        }
+
+# Case-insensitive so `name LIKE 'prefix%'` can seek the index (client typeahead)
+db.Index('ix_client_name_nocase', collate(Client.name, 'NOCASE'))
+
 class Sale(db.Model):
     """Model to store sales records"""
+    __table_args__ = (
+        db.Index('ix_sale_status_date', 'status', 'date'),
+        db.Index('ix_sale_client_date', 'client_id', 'date'),
+        db.Index('ix_sale_status_id', 'status', 'id'),
+        db.Index('ix_sale_client_id', 'client_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     client_name = db.Column(db.String(100), nullable=False)
+    # Set from client_name when the deal is recorded; NULL if no client matches
+    client_id = db.Column(db.Integer, db.ForeignKey('client.id'))
+    client = db.relationship('Client', lazy='joined')
     service = db.Column(db.String(100), nullable=False)
     amount = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(20), default='In Progress') # In Progress, Closed Won, Closed Lost
-    date = db.Column(db.String(20), nullable=False)
+    date = db.Column(db.Date, nullable=False)
 
 # ==========================================
 # HTML TEMPLATES
@@ -68,9 +207,9 @@ BASE_TEMPLATE = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>AgencyOS | Owner Tracker</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/bootstrap-icons.css">
+    <link href="{{ asset_url('vendor/bootstrap/bootstrap.min.css') }}" rel="stylesheet">
+    <script src="{{ asset_url('vendor/chart.js/chart.umd.js') }}"></script>
+    <link rel="stylesheet" href="{{ asset_url('vendor/bootstrap-icons/bootstrap-icons.css') }}">
     <style>
         body { background-color: #f4f6f9; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
         .sidebar { min-height: 100vh; background: #1e293b; color: white; }
@@ -89,6 +228,9 @@ BASE_TEMPLATE = """
             <!-- Sidebar -->
             <div class="col-md-2 sidebar p-3">
                 <h3 class="text-center mb-4 fw-bold"><i class="bi bi-rocket-takeoff"></i> AgencyOS</h3>
+                <form action="/search" method="GET" class="mb-3">
+                    <input type="search" name="q" value="{{ q if page == 'search' else '' }}" class="form-control form-control-sm" placeholder="Search everything...">
+                </form>
                 <ul class="nav flex-column">
                     <li class="nav-item">
                         <a class="nav-link {% if page == 'home' %}active{% endif %}" href="/">
@@ -115,6 +257,20 @@ BASE_TEMPLATE = """
                             <i class="bi bi-currency-dollar me-2"></i> Sales
                         </a>
                     </li>
+                    <li class="nav-item">
+                        <a class="nav-link {% if page == 'jobs' %}active{% endif %}" href="/jobs">
+                            <i class="bi bi-hourglass-split me-2"></i> Jobs
+                        </a>
+                    </li>
+                    {% set quarantined = quarantined_count() %}
+                    {% if quarantined %}
+                    <li class="nav-item">
+                        <a class="nav-link {% if page == 'quarantine' %}active{% endif %}" href="/quarantine">
+                            <i class="bi bi-exclamation-triangle me-2"></i> Needs repair
+                            <span class="badge bg-warning text-dark ms-1">{{ quarantined }}</span>
+                        </a>
+                    </li>
+                    {% endif %}
                 </ul>
                 <hr>
                 <div class="mt-auto text-center text-muted small">
@@ -128,7 +284,7 @@ BASE_TEMPLATE = """
             </div>
         </div>
     </div>
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
+    <script src="{{ asset_url('vendor/bootstrap/bootstrap.bundle.min.js') }}"></script>
 </body>
 </html>
 """
@@ -160,7 +316,7 @@ DASHBOARD_TEMPLATE = """
     <!-- Timeframe Selector Form -->
     <form action="/dashboard" method="GET" class="d-flex align-items-center">
         <label class="me-2 text-muted small fw-bold">View Data:</label>
-        <select name="timeframe" class="form-select form-select-sm border-0 shadow-sm bg-white fw-bold text-primary" style="width: auto; cursor: pointer;" onchange="this.form.submit()">
+        <select name="timeframe" class="form-select form-select-sm border-0 shadow-sm bg-white fw-bold text-primary" style="width: auto; cursor: pointer;" onchange="loadDashboard(this.value)">
             <option value="1m" {% if selected_timeframe == '1m' %}selected{% endif %}>Last 30 Days</option>
             <option value="3m" {% if selected_timeframe == '3m' %}selected{% endif %}>Last 3 Months</option>
             <option value="6m" {% if selected_timeframe == '6m' %}selected{% endif %}>Last 6 Months</option>
@@ -170,34 +326,48 @@ DASHBOARD_TEMPLATE = """
     </form>
 </div>
 
+{% macro change_line(id, change) %}
+<div id="{{ id }}" class="small {{ {'up': 'text-success', 'down': 'text-danger'}.get(change.trend, 'text-muted') }}">{{ change.text }}</div>
+{% endmacro %}
+
 <!-- Key Metrics Row -->
 <div class="row mb-4">
-    <div class="col-md-3">
+    <div class="col-md">
         <div class="card stat-card p-3 h-100" style="border-color: #3b82f6;">
-            <h6 class="text-muted">Revenue ({{ selected_label }})</h6>
-            <h3>${{ current_revenue }}</h3>
+            <h6 class="text-muted">Revenue (<span class="js-timeframe-label">{{ selected_label }}</span>)</h6>
+            <h3>$<span id="kpiRevenue">{{ current_revenue }}</span></h3>
             <small class="text-success"><i class="bi bi-check-circle"></i> Closed won deals</small>
+            {{ change_line('changeRevenue', revenue_change) }}
         </div>
     </div>
-    <div class="col-md-3">
+    <div class="col-md">
+        <div class="card stat-card p-3 h-100" style="border-color: #8b5cf6;">
+            <h6 class="text-muted">Win Rate (<span class="js-timeframe-label">{{ selected_label }}</span>)</h6>
+            <h3 id="kpiWinRate">{{ win_rate }}</h3>
+            <small class="text-muted">Won vs. won + lost deals</small>
+            {{ change_line('changeWinRate', win_rate_change) }}
+        </div>
+    </div>
+    <div class="col-md">
         <div class="card stat-card p-3 h-100" style="border-color: #10b981;">
             <h6 class="text-muted">Active Clients</h6>
-            <h3>{{ active_clients }}</h3>
+            <h3 id="kpiActiveClients">{{ active_clients }}</h3>
             <small class="text-muted">Generating recurring rev</small>
         </div>
     </div>
-    <div class="col-md-3">
+    <div class="col-md">
         <div class="card stat-card p-3 h-100" style="border-color: #f59e0b;">
             <h6 class="text-muted">Pending Tasks</h6>
-            <h3>{{ pending_count }}</h3>
+            <h3 id="kpiPending">{{ pending_count }}</h3>
             <small class="text-warning">Focus required</small>
         </div>
     </div>
-    <div class="col-md-3">
+    <div class="col-md">
         <div class="card stat-card p-3 h-100" style="border-color: #ef4444;">
-            <h6 class="text-muted">Pipeline ({{ selected_label }})</h6>
-            <h3>${{ pipeline_value }}</h3>
+            <h6 class="text-muted">Pipeline (<span class="js-timeframe-label">{{ selected_label }}</span>)</h6>
+            <h3>$<span id="kpiPipeline">{{ pipeline_value }}</span></h3>
             <small class="text-primary">Potential deal value</small>
+            {{ change_line('changePipeline', pipeline_change) }}
         </div>
     </div>
 </div>
@@ -208,7 +378,7 @@ DASHBOARD_TEMPLATE = """
         <div class="card p-4 h-100">
             <div class="d-flex justify-content-between align-items-center mb-3">
                 <h5 class="m-0">Revenue Trend</h5>
-                <span class="badge bg-light text-muted">{{ selected_label }}</span>
+                <span class="badge bg-light text-muted js-timeframe-label">{{ selected_label }}</span>
             </div>
             <div style="height: 300px;">
                 <canvas id="revenueChart"></canvas>
@@ -228,10 +398,10 @@ DASHBOARD_TEMPLATE = """
 <script>
     // Revenue Chart
     const ctxRev = document.getElementById('revenueChart').getContext('2d');
-    const revenueLabels = {{ revenue_labels | safe }};
-    const revenueData = {{ revenue_data | safe }};
+    const revenueLabels = {{ revenue_labels | tojson }};
+    const revenueData = {{ revenue_data | tojson }};
 
-    new Chart(ctxRev, {
+    const revenueChart = new Chart(ctxRev, {
         type: 'line',
         data: {
             labels: revenueLabels,
@@ -271,16 +441,16 @@ DASHBOARD_TEMPLATE = """
 
     // Task Distribution Chart
     const ctxTask = document.getElementById('taskChart').getContext('2d');
-    const taskLabels = {{ category_labels | safe }};
-    const taskData = {{ category_data | safe }};
+    const taskLabels = {{ category_labels | tojson }};
+    const taskData = {{ category_data | tojson }};
 
-    new Chart(ctxTask, {
+    const taskChart = new Chart(ctxTask, {
         type: 'doughnut',
         data: {
             labels: taskLabels,
             datasets: [{
                 data: taskData,
-                backgroundColor: ['#3b82f6', '#10b981', '#f59e0b', '#6366f1', '#ef4444'],
+                backgroundColor: ['#3b82f6', '#10b981', '#f59e0b', '#6366f1', '#ef4444', '#14b8a6', '#ec4899', '#8b5cf6', '#64748b'],
                 borderWidth: 0
             }]
         },
@@ -293,6 +463,40 @@ DASHBOARD_TEMPLATE = """
             }
         }
     });
+
+    // Timeframe switches fetch only the numbers and update the page in place.
+    // /api/dashboard sends an ETag, so unchanged data comes back as a 304.
+    function setChange(id, change) {
+        const el = document.getElementById(id);
+        el.textContent = change.text;
+        el.className = 'small ' + ({ up: 'text-success', down: 'text-danger' }[change.trend] || 'text-muted');
+    }
+
+    function loadDashboard(timeframe) {
+        fetch('/api/dashboard?timeframe=' + encodeURIComponent(timeframe))
+            .then(resp => resp.json())
+            .then(data => {
+                document.querySelectorAll('.js-timeframe-label').forEach(el => el.textContent = data.selected_label);
+                document.getElementById('kpiRevenue').textContent = data.current_revenue;
+                document.getElementById('kpiPipeline').textContent = data.pipeline_value;
+                document.getElementById('kpiActiveClients').textContent = data.active_clients;
+                document.getElementById('kpiPending').textContent = data.pending_count;
+                document.getElementById('kpiWinRate').textContent = data.win_rate;
+                setChange('changeRevenue', data.revenue_change);
+                setChange('changePipeline', data.pipeline_change);
+                setChange('changeWinRate', data.win_rate_change);
+
+                revenueChart.data.labels = data.revenue_labels;
+                revenueChart.data.datasets[0].data = data.revenue_data;
+                revenueChart.update();
+
+                taskChart.data.labels = data.category_labels;
+                taskChart.data.datasets[0].data = data.category_data;
+                taskChart.update();
+
+                history.replaceState(null, '', '/dashboard?timeframe=' + encodeURIComponent(timeframe));
+            });
+    }
 </script>
 {% endblock %}
 """
@@ -302,21 +506,41 @@ WORKBENCH_TEMPLATE = """
 {% block content %}
 <div class="d-flex justify-content-between align-items-center mb-4">
     <h2 class="fw-bold">Workbench</h2>
-    <button class="btn btn-primary" data-bs-toggle="modal" data-bs-target="#addTaskModal">
-        <i class="bi bi-plus-lg"></i> New Task
-    </button>
+    <div class="d-flex gap-2">
+        {% with kind='tasks' %}{% include "bulk_tools" %}{% endwith %}
+        <button class="btn btn-primary" data-bs-toggle="modal" data-bs-target="#addTaskModal">
+            <i class="bi bi-plus-lg"></i> New Task
+        </button>
+    </div>
 </div>
 
 <div class="row">
     <div class="col-md-12">
         <div class="card p-0 overflow-hidden">
-            <div class="card-header bg-white py-3">
+            <div class="card-header bg-white py-3 d-flex justify-content-between align-items-center">
                 <h5 class="m-0">Current Agenda</h5>
+                <form action="/workbench" method="GET" class="d-flex gap-2">
+                    <input type="search" name="q" value="{{ filters.q }}" class="form-control form-control-sm" placeholder="Search tasks...">
+                    <select name="category" class="form-select form-select-sm" style="width: auto;">
+                        <option value="">All Categories</option>
+                        {% for cat in ['Meeting', 'Delivery', 'Outreach', 'Admin', 'Strategy'] %}
+                        <option value="{{ cat }}" {% if filters.category == cat %}selected{% endif %}>{{ cat }}</option>
+                        {% endfor %}
+                    </select>
+                    <select name="state" class="form-select form-select-sm" style="width: auto;">
+                        <option value="">Any Status</option>
+                        <option value="pending" {% if filters.state == 'pending' %}selected{% endif %}>Pending</option>
+                        <option value="done" {% if filters.state == 'done' %}selected{% endif %}>Done</option>
+                    </select>
+                    <button type="submit" class="btn btn-sm btn-outline-primary"><i class="bi bi-search"></i></button>
+                </form>
             </div>
+            {% with kind='tasks' %}{% include "bulk_bar" %}{% endwith %}
             <div class="table-responsive">
                 <table class="table table-hover mb-0 align-middle">
                     <thead class="table-light">
                         <tr>
+                            <th style="width: 1%;"><input type="checkbox" class="form-check-input" id="checkAll" title="Select all"></th>
                             <th>Status</th>
                             <th>Task</th>
                             <th>Category</th>
@@ -327,6 +551,7 @@ WORKBENCH_TEMPLATE = """
                     <tbody>
                         {% for task in tasks %}
                         <tr class="{% if task.is_completed %}table-light{% endif %}">
+                            <td><input type="checkbox" class="form-check-input row-check" name="ids" value="{{ task.id }}" form="bulkForm"></td>
                             <td>
                                 {% if task.is_completed %}
                                 <span class="badge bg-success rounded-pill">Done</span>
@@ -344,19 +569,23 @@ WORKBENCH_TEMPLATE = """
                                 {{ task.due_date }}
                             </td>
                             <td class="text-end">
-                                {% if not task.is_completed %}
-                                <a href="/complete/{{ task.id }}" class="btn btn-sm btn-outline-success me-1" title="Mark Done">
-                                    <i class="bi bi-check-lg"></i>
-                                </a>
-                                {% endif %}
-                                <a href="/delete/{{ task.id }}" class="btn btn-sm btn-outline-danger" title="Delete" onclick="return confirm('Remove this task?')">
-                                    <i class="bi bi-trash"></i>
-                                </a>
+                                <form action="/bulk/tasks" method="POST" class="d-inline">
+                                    <input type="hidden" name="ids" value="{{ task.id }}">
+                                    <input type="hidden" name="next" value="{{ request.full_path }}">
+                                    {% if not task.is_completed %}
+                                    <button type="submit" name="action" value="complete" class="btn btn-sm btn-outline-success me-1" title="Mark Done">
+                                        <i class="bi bi-check-lg"></i>
+                                    </button>
+                                    {% endif %}
+                                    <button type="submit" name="action" value="delete" class="btn btn-sm btn-outline-danger" title="Delete" onclick="return confirm('Remove this task?')">
+                                        <i class="bi bi-trash"></i>
+                                    </button>
+                                </form>
                             </td>
                         </tr>
                         {% else %}
                         <tr>
-                            <td colspan="5" class="text-center py-4 text-muted">
+                            <td colspan="6" class="text-center py-4 text-muted">
                                 <i class="bi bi-inbox display-6 d-block mb-2"></i>
                                 No tasks scheduled. Time to scale?
                             </td>
@@ -365,6 +594,7 @@ WORKBENCH_TEMPLATE = """
                     </tbody>
                 </table>
             </div>
+            {% include "pager" %}
         </div>
     </div>
 </div>
@@ -413,16 +643,32 @@ CLIENTS_TEMPLATE = """
 {% block content %}
 <div class="d-flex justify-content-between align-items-center mb-4">
     <h2 class="fw-bold">Client Directory</h2>
-    <button class="btn btn-primary" data-bs-toggle="modal" data-bs-target="#addClientModal">
-        <i class="bi bi-person-plus-fill"></i> Add Client
-    </button>
+    <div class="d-flex gap-2">
+        {% with kind='clients' %}{% include "bulk_tools" %}{% endwith %}
+        <button class="btn btn-primary" data-bs-toggle="modal" data-bs-target="#addClientModal">
+            <i class="bi bi-person-plus-fill"></i> Add Client
+        </button>
+    </div>
 </div>
 
+<form action="/clients" method="GET" class="d-flex gap-2 mb-3">
+    <input type="search" name="q" value="{{ filters.q }}" class="form-control" placeholder="Search name, company or email...">
+    <select name="status" class="form-select" style="width: auto;">
+        <option value="">All Statuses</option>
+        {% for st in ['Lead', 'Active', 'Churned'] %}
+        <option value="{{ st }}" {% if filters.status == st %}selected{% endif %}>{{ st }}</option>
+        {% endfor %}
+    </select>
+    <button type="submit" class="btn btn-outline-primary"><i class="bi bi-search"></i></button>
+</form>
+
 <div class="card border-0 shadow-sm">
+    {% with kind='clients' %}{% include "bulk_bar" %}{% endwith %}
     <div class="table-responsive">
         <table class="table table-hover align-middle mb-0">
             <thead class="table-light">
                 <tr>
+                    <th style="width: 1%;"><input type="checkbox" class="form-check-input" id="checkAll" title="Select all"></th>
                     <th>Client / Company</th>
                     <th>Contact</th>
                     <th>Status</th>
@@ -432,8 +678,9 @@ CLIENTS_TEMPLATE = """
             <tbody>
                 {% for client in clients %}
                 <tr>
+                    <td><input type="checkbox" class="form-check-input row-check" name="ids" value="{{ client.id }}" form="bulkForm"></td>
                     <td>
-                        <div class="fw-bold">{{ client.name }}</div>
+                        <a href="/clients/{{ client.id }}" class="fw-bold text-decoration-none text-body">{{ client.name }}</a>
                         <div class="small text-muted">{{ client.company }}</div>
                     </td>
                     <td>
@@ -449,12 +696,16 @@ CLIENTS_TEMPLATE = """
                         {% endif %}
                     </td>
                     <td class="text-end">
-                        <a href="/delete_client/{{ client.id }}" class="btn btn-sm btn-outline-danger" onclick="return confirm('Delete this client?')"><i class="bi bi-trash"></i></a>
+                        <form action="/bulk/clients" method="POST" class="d-inline">
+                            <input type="hidden" name="ids" value="{{ client.id }}">
+                            <input type="hidden" name="next" value="{{ request.full_path }}">
+                            <button type="submit" name="action" value="delete" class="btn btn-sm btn-outline-danger" onclick="return confirm('Delete this client?')"><i class="bi bi-trash"></i></button>
+                        </form>
                     </td>
                 </tr>
                 {% else %}
                 <tr>
-                    <td colspan="4" class="text-center py-5 text-muted">
+                    <td colspan="5" class="text-center py-5 text-muted">
                         <i class="bi bi-people display-4 d-block mb-3"></i>
                         No clients found. Add your first client!
                     </td>
@@ -463,6 +714,7 @@ CLIENTS_TEMPLATE = """
             </tbody>
         </table>
     </div>
+    {% include "pager" %}
 </div>
 
 <!-- Add Client Modal -->
@@ -512,18 +764,46 @@ SALES_TEMPLATE = """
 {% block content %}
 <div class="d-flex justify-content-between align-items-center mb-4">
     <h2 class="fw-bold">Sales Tracker</h2>
-    <button class="btn btn-primary" data-bs-toggle="modal" data-bs-target="#addSaleModal">
-        <i class="bi bi-currency-dollar"></i> Record Sale
-    </button>
+    <div class="d-flex gap-2">
+        {% with kind='sales' %}{% include "bulk_tools" %}{% endwith %}
+        <button class="btn btn-primary" data-bs-toggle="modal" data-bs-target="#addSaleModal">
+            <i class="bi bi-currency-dollar"></i> Record Sale
+        </button>
+    </div>
 </div>
 
+<form action="/sales" method="GET" class="d-flex gap-2 mb-3">
+    <input type="search" name="q" value="{{ filters.q }}" class="form-control" placeholder="Search client or service...">
+    <select name="status" class="form-select" style="width: auto;">
+        <option value="">All Statuses</option>
+        {% for st in ['In Progress', 'Closed Won', 'Closed Lost'] %}
+        <option value="{{ st }}" {% if filters.status == st %}selected{% endif %}>{{ st }}</option>
+        {% endfor %}
+    </select>
+    {% if filters.client %}<input type="hidden" name="client" value="{{ filters.client }}">{% endif %}
+    <button type="submit" class="btn btn-outline-primary"><i class="bi bi-search"></i></button>
+</form>
+
+{% if unlinked %}
+<div class="alert alert-light border small py-2">
+    {% if filters.client == 'none' %}
+    Showing deals whose client name matches no client. Add a client with that name to link them. <a href="/sales">Show all deals</a>
+    {% else %}
+    {{ "{:,}".format(unlinked_max) ~ "+" if unlinked > unlinked_max else unlinked }} deal{{ '' if unlinked == 1 else 's' }} name a client that does not exist, so they are not linked to a client page.
+    <a href="/sales?client=none">Show them</a>
+    {% endif %}
+</div>
+{% endif %}
+
 <div class="row mb-4">
     <div class="col-md-12">
         <div class="card border-0 shadow-sm">
+            {% with kind='sales' %}{% include "bulk_bar" %}{% endwith %}
             <div class="table-responsive">
                 <table class="table table-hover align-middle mb-0">
                     <thead class="table-light">
                         <tr>
+                            <th style="width: 1%;"><input type="checkbox" class="form-check-input" id="checkAll" title="Select all"></th>
                             <th>Client</th>
                             <th>Service / Deal</th>
                             <th>Date</th>
@@ -535,7 +815,14 @@ SALES_TEMPLATE = """
                     <tbody>
                         {% for sale in sales %}
                         <tr>
-                            <td class="fw-bold">{{ sale.client_name }}</td>
+                            <td><input type="checkbox" class="form-check-input row-check" name="ids" value="{{ sale.id }}" form="bulkForm"></td>
+                            <td class="fw-bold">
+                                {% if sale.client %}
+                                <a href="/clients/{{ sale.client_id }}" class="text-decoration-none">{{ sale.client.name }}</a>
+                                {% else %}
+                                {{ sale.client_name }}
+                                {% endif %}
+                            </td>
                             <td>{{ sale.service }}</td>
                             <td>{{ sale.date }}</td>
                             <td>${{ sale.amount }}</td>
@@ -549,12 +836,16 @@ SALES_TEMPLATE = """
                                 {% endif %}
                             </td>
                             <td class="text-end">
-                                <a href="/delete_sale/{{ sale.id }}" class="btn btn-sm btn-outline-danger" onclick="return confirm('Remove this record?')"><i class="bi bi-trash"></i></a>
+                                <form action="/bulk/sales" method="POST" class="d-inline">
+                                    <input type="hidden" name="ids" value="{{ sale.id }}">
+                                    <input type="hidden" name="next" value="{{ request.full_path }}">
+                                    <button type="submit" name="action" value="delete" class="btn btn-sm btn-outline-danger" onclick="return confirm('Remove this record?')"><i class="bi bi-trash"></i></button>
+                                </form>
                             </td>
                         </tr>
                         {% else %}
                         <tr>
-                            <td colspan="6" class="text-center py-5 text-muted">
+                            <td colspan="7" class="text-center py-5 text-muted">
                                 <i class="bi bi-wallet2 display-4 d-block mb-3"></i>
                                 No sales records found.
                             </td>
@@ -563,6 +854,7 @@ SALES_TEMPLATE = """
                     </tbody>
                 </table>
             </div>
+            {% include "pager" %}
         </div>
     </div>
 </div>
@@ -579,15 +871,8 @@ SALES_TEMPLATE = """
                 <div class="modal-body">
                     <div class="mb-3">
                         <label class="form-label">Client</label>
-                        <select name="client_name" class="form-select" required>
-                            <option value="" disabled selected>Select a client...</option>
-                            {% for client in clients %}
-                                <option value="{{ client.name }}">{{ client.name }} ({{ client.company }})</option>
-                            {% endfor %}
-                        </select>
-                        {% if not clients %}
-                            <div class="form-text text-danger">No clients found. Please add a client first.</div>
-                        {% endif %}
+                        <input type="text" name="client_name" class="form-control" list="clientOptions" autocomplete="off" placeholder="Start typing a client name..." required>
+                        <datalist id="clientOptions"></datalist>
                     </div>
                     <div class="mb-3">
                         <label class="form-label">Service / Project Name</label>
@@ -618,9 +903,424 @@ SALES_TEMPLATE = """
         </div>
     </div>
 </div>
+<script>
+    // Client typeahead: fetch matching names instead of embedding every client
+    const clientInput = document.querySelector('#addSaleModal input[name="client_name"]');
+    const clientOptions = document.getElementById('clientOptions');
+    let clientTimer = null;
+
+    function loadClientOptions() {
+        fetch('/api/client_names?q=' + encodeURIComponent(clientInput.value))
+            .then(resp => resp.json())
+            .then(names => {
+                clientOptions.replaceChildren(...names.map(name => {
+                    const opt = document.createElement('option');
+                    opt.value = name;
+                    return opt;
+                }));
+            });
+    }
+
+    clientInput.addEventListener('input', () => {
+        clearTimeout(clientTimer);
+        clientTimer = setTimeout(loadClientOptions, 150);
+    });
+    clientInput.addEventListener('focus', loadClientOptions, { once: true });
+</script>
+{% endblock %}
+"""
+
+CLIENT_DETAIL_TEMPLATE = """
+{% extends "base" %}
+{% block content %}
+<div class="d-flex justify-content-between align-items-center mb-4">
+    <div>
+        <a href="/clients" class="small text-decoration-none">&larr; Client Directory</a>
+        <h2 class="fw-bold mb-0">{{ client.name }}</h2>
+        <div class="text-muted">{{ client.company or '' }}{% if client.email %} &middot; {{ client.email }}{% endif %} &middot; {{ client.status }}</div>
+    </div>
+</div>
+
+<div class="row mb-4">
+    <div class="col-md-3">
+        <div class="card stat-card p-3 h-100" style="border-color: #3b82f6;">
+            <h6 class="text-muted">Revenue Won</h6>
+            <h3>${{ won_revenue }}</h3>
+            <small class="text-success"><i class="bi bi-check-circle"></i> Closed won deals</small>
+        </div>
+    </div>
+    <div class="col-md-3">
+        <div class="card stat-card p-3 h-100" style="border-color: #ef4444;">
+            <h6 class="text-muted">Open Pipeline</h6>
+            <h3>${{ pipeline_value }}</h3>
+            <small class="text-primary">In progress</small>
+        </div>
+    </div>
+    <div class="col-md-3">
+        <div class="card stat-card p-3 h-100" style="border-color: #f59e0b;">
+            <h6 class="text-muted">Lost</h6>
+            <h3>${{ lost_value }}</h3>
+            <small class="text-muted">Closed lost deals</small>
+        </div>
+    </div>
+    <div class="col-md-3">
+        <div class="card stat-card p-3 h-100" style="border-color: #10b981;">
+            <h6 class="text-muted">Deals</h6>
+            <h3>{{ deal_count }}</h3>
+            <small class="text-muted">All statuses</small>
+        </div>
+    </div>
+</div>
+
+{% if month_labels %}
+<div class="card p-4 mb-4">
+    <h5>Revenue Won by Month</h5>
+    <div style="height: 250px;">
+        <canvas id="clientRevenueChart"></canvas>
+    </div>
+</div>
+<script>
+    new Chart(document.getElementById('clientRevenueChart').getContext('2d'), {
+        type: 'bar',
+        data: {
+            labels: {{ month_labels | tojson }},
+            datasets: [{ label: 'Revenue ($)', data: {{ month_revenue | tojson }}, backgroundColor: '#3b82f6' }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            scales: { y: { beginAtZero: true }, x: { grid: { display: false } } },
+            plugins: { legend: { display: false } }
+        }
+    });
+</script>
+{% endif %}
+
+<div class="card border-0 shadow-sm">
+    <div class="card-header bg-white py-3"><h5 class="m-0">Deal History</h5></div>
+    <div class="table-responsive">
+        <table class="table table-hover align-middle mb-0">
+            <thead class="table-light">
+                <tr>
+                    <th>Date</th>
+                    <th>Service / Deal</th>
+                    <th>Amount</th>
+                    <th>Status</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for sale in history %}
+                <tr>
+                    <td>{{ sale.date }}</td>
+                    <td>{{ sale.service }}</td>
+                    <td>${{ sale.amount }}</td>
+                    <td>
+                        {% if sale.status == 'Closed Won' %}
+                            <span class="badge bg-success">Won</span>
+                        {% elif sale.status == 'Closed Lost' %}
+                            <span class="badge bg-danger">Lost</span>
+                        {% else %}
+                            <span class="badge bg-warning text-dark">In Progress</span>
+                        {% endif %}
+                    </td>
+                </tr>
+                {% else %}
+                <tr>
+                    <td colspan="4" class="text-center py-5 text-muted">
+                        <i class="bi bi-wallet2 display-4 d-block mb-3"></i>
+                        No deals recorded for this client yet.
+                    </td>
+                </tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    </div>
+    {% include "pager" %}
+</div>
+{% endblock %}
+"""
+
+SEARCH_TEMPLATE = """
+{% extends "base" %}
+{% block content %}
+<div class="d-flex justify-content-between align-items-center mb-4">
+    <h2 class="fw-bold">Search</h2>
+</div>
+
+<form action="/search" method="GET" class="d-flex gap-2 mb-4">
+    <input type="search" name="q" value="{{ q }}" class="form-control" placeholder="e.g. acme seo" autofocus>
+    <button type="submit" class="btn btn-outline-primary"><i class="bi bi-search"></i></button>
+</form>
+
+{% if q %}
+{% for kind, title in [('clients', 'Clients'), ('sales', 'Deals'), ('tasks', 'Tasks')] %}
+<div class="card border-0 shadow-sm mb-4">
+    <div class="card-header bg-white fw-bold">{{ title }} <span class="badge bg-light text-muted border">{{ results[kind] | length }}</span>
+        {% if kind in narrowed %}<span class="small text-muted fw-normal ms-2">More than {{ "{:,}".format(ranked_max) }} matches: only the newest {{ "{:,}".format(ranked_max) }} were ranked, name matches first. Add a word to narrow the search.</span>{% endif %}
+    </div>
+    <ul class="list-group list-group-flush">
+        {% for hit in results[kind] %}
+        <li class="list-group-item">
+            <a href="{{ hit.url }}" class="text-decoration-none text-body">
+            {% if kind == 'clients' %}
+                <span class="fw-bold">{{ hit.fields.name }}</span>
+                <span class="small text-muted ms-2">{{ hit.fields.company }}{% if hit.obj.email %} &middot; {{ hit.fields.email }}{% endif %} &middot; {{ hit.obj.status }}</span>
+            {% elif kind == 'sales' %}
+                <span class="fw-bold">{{ hit.fields.client_name }}</span> &ndash; {{ hit.fields.service }}
+                <span class="small text-muted ms-2">${{ "{:,.2f}".format(hit.obj.amount) }} &middot; {{ hit.obj.status }} &middot; {{ hit.obj.date }}</span>
+            {% else %}
+                <span class="fw-bold">{{ hit.fields.title }}</span>
+                <span class="small text-muted ms-2">{{ hit.obj.category }} &middot; due {{ hit.obj.due_date }}{% if hit.obj.is_completed %} &middot; done{% endif %}</span>
+            {% endif %}
+            </a>
+        </li>
+        {% else %}
+        <li class="list-group-item text-muted small">No matching {{ title | lower }}.</li>
+        {% endfor %}
+    </ul>
+</div>
+{% endfor %}
+{% endif %}
+{% endblock %}
+"""
+
+JOBS_TEMPLATE = """
+{% extends "base" %}
+{% block content %}
+<div class="d-flex justify-content-between align-items-center mb-4">
+    <h2 class="fw-bold">Background Jobs</h2>
+</div>
+
+<div class="card border-0 shadow-sm mb-4">
+    <div class="card-body d-flex flex-wrap gap-2 align-items-center">
+        <button class="btn btn-outline-primary" onclick="startJob('rebuild-rollup')">Rebuild revenue rollup</button>
+        <button class="btn btn-outline-primary" onclick="startJob('rebuild-search-index')">Rebuild search index</button>
+        <button class="btn btn-outline-primary" onclick="startJob('optimize')">Optimize database</button>
+        <button class="btn btn-outline-primary" onclick="startJob('backup')">Back up database</button>
+        <div class="input-group" style="width: auto;">
+            <select id="exportKind" class="form-select">
+                <option value="sales">Sales</option>
+                <option value="clients">Clients</option>
+                <option value="tasks">Tasks</option>
+            </select>
+            <select id="exportFormat" class="form-select">
+                <option value="csv">CSV</option>
+                <option value="json">JSON</option>
+            </select>
+            <button class="btn btn-outline-primary" onclick="startJob('export', {kind: exportKind.value, fmt: exportFormat.value})"><i class="bi bi-download"></i> Export to file</button>
+        </div>
+    </div>
+</div>
+
+<div class="card border-0 shadow-sm">
+    <div class="table-responsive">
+        <table class="table align-middle mb-0">
+            <thead class="table-light">
+                <tr><th>#</th><th>Job</th><th>Status</th><th style="width: 30%;">Progress</th><th>Result</th><th>Started</th></tr>
+            </thead>
+            <tbody id="jobRows"></tbody>
+        </table>
+    </div>
+</div>
+
+<script>
+    const BADGES = {queued: 'bg-secondary', running: 'bg-primary', done: 'bg-success', failed: 'bg-danger'};
+
+    function escapeHtml(value) {
+        const div = document.createElement('div');
+        div.textContent = value == null ? '' : String(value);
+        return div.innerHTML;
+    }
+
+    function progressCell(job) {
+        if (job.total) {
+            const pct = Math.min(100, Math.round(100 * job.progress / job.total));
+            return `<div class="progress" style="height: 6px;"><div class="progress-bar" style="width: ${pct}%"></div></div>
+                    <small class="text-muted">${job.progress.toLocaleString()} / ${job.total.toLocaleString()}</small>`;
+        }
+        return job.progress ? `<small class="text-muted">${job.progress.toLocaleString()}</small>` : '';
+    }
+
+    function resultCell(job) {
+        if (job.status === 'failed' || !job.result) return `<small class="text-muted">${escapeHtml(job.message)}</small>`;
+        if (job.result.download) return `<a href="/jobs/${job.id}/download">${escapeHtml(job.result.file)}</a>`;
+        return `<small class="text-muted">${escapeHtml(job.message || JSON.stringify(job.result))}</small>`;
+    }
+
+    function render(jobs) {
+        jobRows.innerHTML = jobs.map(job => `
+            <tr>
+                <td>${job.id}</td>
+                <td class="fw-bold">${escapeHtml(job.kind)} <small class="text-muted fw-normal">${escapeHtml(Object.values(job.params).join(' '))}</small></td>
+                <td><span class="badge ${BADGES[job.status]}">${job.status}</span></td>
+                <td>${progressCell(job)}</td>
+                <td>${resultCell(job)}</td>
+                <td><small class="text-muted">${escapeHtml(job.created_at)}</small></td>
+            </tr>`).join('') || '<tr><td colspan="6" class="text-center py-4 text-muted">No jobs yet.</td></tr>';
+    }
+
+    // Poll while anything is queued or running, then stop
+    let timer = null;
+    function refresh() {
+        fetch('/api/jobs').then(resp => resp.json()).then(jobs => {
+            render(jobs);
+            clearTimeout(timer);
+            if (jobs.some(job => job.status === 'queued' || job.status === 'running')) timer = setTimeout(refresh, 1000);
+        });
+    }
+
+    function startJob(kind, params) {
+        fetch('/jobs/' + kind, { method: 'POST', body: new URLSearchParams(params || {}) })
+            .then(resp => resp.ok ? refresh() : alert('Could not start job: ' + resp.statusText));
+    }
+
+    render({{ jobs | tojson }});
+    refresh();
+</script>
+{% endblock %}
+"""
+
+QUARANTINE_TEMPLATE = """
+{% extends "base" %}
+{% block content %}
+<div class="d-flex justify-content-between align-items-center mb-4">
+    <h2 class="fw-bold">Needs Repair</h2>
+</div>
+<p class="text-muted">An upgrade found these records with a date it could not read, so it set them aside instead of guessing. Enter the correct date to put a record back, or discard it.</p>
+
+<div class="card border-0 shadow-sm">
+    <div class="table-responsive">
+        <table class="table align-middle mb-0">
+            <thead class="table-light">
+                <tr><th>Record</th><th>Problem</th><th>Original values</th><th style="width: 30%;">Repair</th></tr>
+            </thead>
+            <tbody>
+                {% for row in rows %}
+                <tr>
+                    <td class="fw-bold">{{ row.table_name }} #{{ row.row_id }}</td>
+                    <td><small class="text-danger">{{ row.reason }}</small></td>
+                    <td><small class="text-muted">{% for name, value in row.payload.items() %}{{ name }}: <code>{{ value }}</code>{% if not loop.last %}, {% endif %}{% endfor %}</small></td>
+                    <td>
+                        <form action="/quarantine/{{ row.id }}/restore" method="POST" class="d-flex gap-2 mb-1">
+                            <input type="date" name="date" class="form-control form-control-sm" required>
+                            <button class="btn btn-sm btn-primary">Restore</button>
+                        </form>
+                        <form action="/quarantine/{{ row.id }}/discard" method="POST" onsubmit="return confirm('Discard this record for good?')">
+                            <button class="btn btn-sm btn-link text-danger p-0">Discard</button>
+                        </form>
+                    </td>
+                </tr>
+                {% else %}
+                <tr><td colspan="4" class="text-center py-4 text-muted">Nothing needs repair.</td></tr>
+                {% endfor %}
+            </tbody>
+        </table>
+    </div>
+</div>
 {% endblock %}
 """
 
+PAGER_TEMPLATE = """
+<div class="d-flex justify-content-between align-items-center px-3 py-2 border-top small text-muted">
+    {% if pager.streamed %}
+    <span>Showing all {{ pager.count }} row{{ '' if pager.count == 1 else 's' }}</span>
+    <div>
+        <a href="{{ pager.paged_url }}" class="btn btn-sm btn-outline-secondary">Paged view</a>
+    </div>
+    {% else %}
+    <span>Showing {{ pager.count }} row{{ '' if pager.count == 1 else 's' }}{% if pager.first_url %} (continued){% endif %}</span>
+    <div>
+        {% if pager.all_url %}
+        <a href="{{ pager.all_url }}" class="btn btn-sm btn-outline-secondary ms-1">Show all</a>
+        {% endif %}
+        {% if pager.first_url %}
+        <a href="{{ pager.first_url }}" class="btn btn-sm btn-outline-secondary"><i class="bi bi-chevron-double-left"></i> First</a>
+        {% endif %}
+        {% if pager.next_url %}
+        <a href="{{ pager.next_url }}" class="btn btn-sm btn-outline-primary ms-1">Next <i class="bi bi-chevron-right"></i></a>
+        {% endif %}
+    </div>
+    {% endif %}
+</div>
+"""
+
+BULK_TOOLS_TEMPLATE = """
+<div class="btn-group">
+    <a href="/export/{{ kind }}.csv" class="btn btn-outline-secondary"><i class="bi bi-download"></i> CSV</a>
+    <a href="/export/{{ kind }}.json" class="btn btn-outline-secondary">JSON</a>
+    <label class="btn btn-outline-secondary mb-0" title="Import a .csv or .json file">
+        <i class="bi bi-upload"></i> Import
+        <input type="file" accept=".csv,.json,.jsonl,.ndjson" hidden onchange="importFile(this, '{{ kind }}')">
+    </label>
+</div>
+<script>
+    // Runs as a background job; poll it rather than holding the request open
+    function importFile(input, kind) {
+        const file = input.files[0];
+        if (!file) return;
+        const body = new FormData();
+        body.append('kind', kind);
+        body.append('file', file);
+        input.closest('label').classList.add('disabled');
+        const poll = job => {
+            if (job.status === 'queued' || job.status === 'running') {
+                return new Promise(done => setTimeout(done, 1000))
+                    .then(() => fetch('/api/jobs/' + job.id)).then(resp => resp.json()).then(poll);
+            }
+            if (job.status === 'failed') throw job.message;
+            return job.result;
+        };
+        fetch('/jobs/import', { method: 'POST', body: body })
+            .then(resp => resp.ok ? resp.json() : Promise.reject(resp.statusText))
+            .then(poll)
+            .then(report => {
+                let msg = `Imported ${report.inserted} rows, rejected ${report.error_count}.`;
+                report.errors.slice(0, 10).forEach(e => { msg += `\nRow ${e.row}: ${e.error}`; });
+                if (report.aborted) msg += `\nStopped early: ${report.aborted}`;
+                alert(msg);
+                location.reload();
+            })
+            .catch(err => { alert('Import failed: ' + err); location.reload(); });
+    }
+</script>
+"""
+
+BULK_BAR_TEMPLATE = """
+<form id="bulkForm" action="/bulk/{{ kind }}" method="POST" class="d-flex align-items-center gap-2 px-3 py-2 border-bottom small">
+    <input type="hidden" name="next" value="{{ request.full_path }}">
+    <span class="text-muted me-auto"><span id="bulkCount">0</span> selected
+        <span id="bulkLimit" class="text-danger ms-2 d-none">Bulk actions take at most {{ "{:,}".format(BULK_IDS_MAX) }} rows at a time</span></span>
+    {% if kind == 'tasks' %}
+    <button type="submit" name="action" value="complete" class="btn btn-sm btn-outline-success bulk-btn" disabled><i class="bi bi-check-lg"></i> Mark Done</button>
+    {% endif %}
+    <button type="submit" name="action" value="delete" class="btn btn-sm btn-outline-danger bulk-btn" disabled><i class="bi bi-trash"></i> Delete</button>
+</form>
+<script>
+    document.addEventListener('DOMContentLoaded', () => {
+        const form = document.getElementById('bulkForm');
+        const all = document.getElementById('checkAll');
+        const boxes = [...document.querySelectorAll('input.row-check')];
+        const max = {{ BULK_IDS_MAX }};
+        const selected = () => boxes.filter(b => b.checked).length;
+        const refresh = () => {
+            const n = selected();
+            document.getElementById('bulkCount').textContent = n.toLocaleString();
+            // "Show all" pages can list more rows than one request may post
+            document.getElementById('bulkLimit').classList.toggle('d-none', n < max || boxes.length <= max);
+            form.querySelectorAll('.bulk-btn').forEach(b => { b.disabled = n === 0 || n > max; });
+            all.checked = n > 0 && n === Math.min(boxes.length, max);
+        };
+        all.addEventListener('change', () => { boxes.forEach((b, i) => { b.checked = all.checked && i < max; }); refresh(); });
+        boxes.forEach(b => b.addEventListener('change', refresh));
+        form.addEventListener('submit', e => {
+            if (e.submitter && e.submitter.value === 'delete' && !confirm(`Delete ${selected()} selected rows?`)) {
+                e.preventDefault();
+            }
+        });
+    });
+</script>
+"""
+
 # Register templates in memory
 app.jinja_loader = jinja2.DictLoader({
     'base': BASE_TEMPLATE,
@@ -628,80 +1328,638 @@ app.jinja_loader = jinja2.DictLoader({
     'dashboard': DASHBOARD_TEMPLATE,
     'workbench': WORKBENCH_TEMPLATE,
     'clients': CLIENTS_TEMPLATE,
-    'sales': SALES_TEMPLATE
+    'sales': SALES_TEMPLATE,
+    'client_detail': CLIENT_DETAIL_TEMPLATE,
+    'search': SEARCH_TEMPLATE,
+    'jobs': JOBS_TEMPLATE,
+    'quarantine': QUARANTINE_TEMPLATE,
+    'pager': PAGER_TEMPLATE,
+    'bulk_tools': BULK_TOOLS_TEMPLATE,
+    'bulk_bar': BULK_BAR_TEMPLATE
 })
 
 # ==========================================
-# ROUTES & LOGIC
+# STATIC ASSETS
 # ==========================================
+# Vendored Bootstrap / Chart.js / icons live in ./static so the desktop app
+# paints without network access. Templates link them through asset_url(),
+# which appends a content hash; those URLs are cached for a year. .br/.gz
+# variants next to each file (see `flask compress-assets`) are served to
+# clients that accept them.
+STATIC_DIR = os.path.join(app.root_path, 'static')
+STATIC_MAX_AGE = 365 * 24 * 3600
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
 
-@app.route('/')
-def home():
-    return render_template('home', page='home')
+@lru_cache(maxsize=None)
+def asset_hash(filename):
+    with open(os.path.join(STATIC_DIR, filename), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
 
-@app.route('/dashboard')
-def dashboard():
-    # --- 1. Get Timeframe & Configure Date Logic ---
-    timeframe = request.args.get('timeframe', '6m')
-    today = datetime.today()
-    start_date_obj = None
-    
-    label_map = {
-        '1m': 'Last 30 Days',
-        '3m': 'Last 3 Months',
-        '6m': 'Last 6 Months',
-        '1y': 'Last Year',
-        'all': 'All Time'
-    }
-    selected_label = label_map.get(timeframe, 'Last 6 Months')
+@app.template_global()
+def asset_url(filename):
+    """URL for a file in ./static, versioned by its content hash."""
+    return url_for('static', filename=filename, v=asset_hash(filename))
 
-    # Determine Start Date for Filtering
-    if timeframe == '1m':
-        start_date_obj = today - timedelta(days=30)
-    elif timeframe == '3m':
-        start_date_obj = today - timedelta(days=90)
-    elif timeframe == '6m':
-        start_date_obj = today - timedelta(days=180)
-    elif timeframe == '1y':
-        start_date_obj = today - timedelta(days=365)
+@app.route('/static/<path:filename>', endpoint='static')
+def static_asset(filename):
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response = None
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in request.accept_encodings and os.path.isfile(safe_join(STATIC_DIR, filename + suffix) or ''):
+            response = send_from_directory(STATIC_DIR, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(STATIC_DIR, filename, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+
+    # send_from_directory already answers If-None-Match with a 304
+    if request.args.get('v') == asset_hash(filename):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
     else:
-        # For 'all', we pick an old date
-        start_date_obj = datetime(1900, 1, 1)
+        response.cache_control.no_cache = True
+    return response
 
-    cutoff_date_str = start_date_obj.strftime('%Y-%m-%d')
+@app.cli.command('compress-assets')
+def compress_assets_command():
+    """Write .gz (and .br, if brotli is installed) next to static text assets."""
+    import gzip
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("brotli not installed; writing gzip variants only.")
+    written = 0
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in files:
+            if not name.endswith(('.css', '.js', '.svg', '.json')):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            for suffix, packed in variants.items():
+                if len(packed) < len(data):
+                    with open(path + suffix, 'wb') as f:
+                        f.write(packed)
+                    written += 1
+    print(f"Wrote {written} precompressed files.")
 
-    # --- 2. KPI Queries (Filtered by Date) ---
-    pending_count = Task.query.filter_by(is_completed=False).count()
-    active_clients = Client.query.filter_by(status='Active').count()
-    
-    # Filter Pipeline (In Progress)
-    pipeline_query = Sale.query.filter(Sale.status == 'In Progress')
-    if timeframe != 'all':
-        pipeline_query = pipeline_query.filter(Sale.date >= cutoff_date_str)
-    pipeline_value = sum(deal.amount for deal in pipeline_query.all())
-
-    # Filter Revenue (Closed Won)
-    revenue_query = Sale.query.filter(Sale.status == 'Closed Won')
-    if timeframe != 'all':
-        revenue_query = revenue_query.filter(Sale.date >= cutoff_date_str)
-    total_revenue = sum(deal.amount for deal in revenue_query.all())
-    
-    # --- 3. Graph Data Generation (REAL Sales Data) ---
-    revenue_labels = []
-    revenue_data = []
-    
-    # Fetch filtered sales for graphing
-    graph_query = Sale.query.filter(Sale.status == 'Closed Won')
-    if timeframe != 'all':
-        graph_query = graph_query.filter(Sale.date >= cutoff_date_str)
-    sales_data = graph_query.order_by(Sale.date).all()
+# ==========================================
+# DASHBOARD CACHE
+# ==========================================
+class DashboardCache:
+    """Bounded LRU of computed dashboard payloads.
+
+    Entries are keyed on (timeframe, calendar day) and stamped with the data
+    version they were computed at. Write routes call bump_data_version(), so
+    the next read of a stale entry drops it and recomputes. `stamp()` covers
+    writers outside this process (CLI commands, a second instance): its
+    value is part of the version, so any change also drops the entry.
+    """
+
+    def __init__(self, max_entries=32, stamp=lambda: None):
+        self.max_entries = max_entries
+        self.stamp = stamp
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+
+    def get(self, timeframe, compute):
+        key = (timeframe, datetime.today().strftime('%Y-%m-%d'))
+        stamp = self.stamp()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == (self.version, stamp):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+            version = (self.version, stamp)
+
+        payload = compute(timeframe)
+
+        with self._lock:
+            # Skip storing if a write landed while we were computing
+            if version == (self.version, self.stamp()):
+                self._entries[key] = (version, payload)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return payload
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+def database_stamp():
+    """(mtime, size) of the database file and its WAL; changes on every commit."""
+    path = app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+    stamp = []
+    for name in (path, path + '-wal'):
+        try:
+            info = os.stat(name)
+            stamp.append((info.st_mtime_ns, info.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+dashboard_cache = DashboardCache(stamp=database_stamp)
+
+def bump_data_version():
+    """Mark cached dashboard data stale after a write."""
+    dashboard_cache.bump()
+
+# ==========================================
+# REQUEST METRICS
+# ==========================================
+# Opt-in (AGENCY_METRICS=1 or `python app.py --metrics`): per-route latency,
+# SQL statements and their durations, and ORM rows loaded per request,
+# served in Prometheus text format at /metrics to local clients only.
+# Statements slower than AGENCY_SLOW_QUERY_MS are logged with their route.
+app.config['METRICS_ENABLED'] = os.environ.get('AGENCY_METRICS', '') not in ('', '0')
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('AGENCY_SLOW_QUERY_MS', 100))
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# name -> (type, help, histogram buckets)
+METRIC_DEFINITIONS = {
+    'agency_http_requests_total': (
+        'counter', 'Requests served, by route, method and status.', None),
+    'agency_http_request_duration_seconds': (
+        'histogram', 'Request latency, including streamed response bodies.', SECONDS_BUCKETS),
+    'agency_sql_statements_per_request': (
+        'histogram', 'SQL statements executed per request.', COUNT_BUCKETS),
+    'agency_sql_statement_duration_seconds': (
+        'histogram', 'Time spent in each SQL statement, by the route that ran it.', SECONDS_BUCKETS),
+    'agency_orm_rows_per_request': (
+        'histogram', 'ORM instances loaded from the database per request.', COUNT_BUCKETS),
+    'agency_sql_slow_statements_total': (
+        'counter', 'SQL statements slower than the slow-query threshold.', None),
+}
+
+def format_labels(pairs):
+    """Render label pairs as {name="value",...}, escaped per the text format."""
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+class RequestMetrics:
+    """Thread-safe counters and histograms, rendered in Prometheus text format.
 
+    Series are keyed on their sorted label pairs. Histograms keep one count
+    per bucket (plus +Inf) and a running sum; render() makes them cumulative.
+    """
+
+    def __init__(self, definitions):
+        self.definitions = definitions
+        self._series = {name: {} for name in definitions}
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels, amount=1):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[name]
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = self.definitions[name][2]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series[name].get(key)
+            if series is None:
+                series = self._series[name][key] = [[0] * (len(buckets) + 1), 0]
+            series[0][bisect.bisect_left(buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in self.definitions.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self._series[name].items()):
+                    if kind == 'counter':
+                        lines.append(f"{name}{format_labels(key)} {value}")
+                        continue
+                    counts, total = value
+                    cumulative = 0
+                    for bound, count in zip([f"{b:g}" for b in buckets] + ['+Inf'], counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{format_labels(key + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(key)} {total:g}")
+                    lines.append(f"{name}_count{format_labels(key)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+metrics = RequestMetrics(METRIC_DEFINITIONS)
+
+def metrics_route():
+    """The matched URL rule, so /clients/1 and /clients/2 share one series."""
+    if not has_request_context():
+        return 'none'
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+def start_request_metrics():
+    g.metrics_start = time.perf_counter()
+    g.metrics_statements = 0
+    g.metrics_rows = 0
+    g.metrics_status = 500
+
+def record_response_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+def finish_request_metrics(exc):
+    # Runs on teardown, i.e. after a stream_with_context body has been sent
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return
+    route = metrics_route()
+    labels = {'route': route, 'method': request.method}
+    metrics.inc('agency_http_requests_total', dict(labels, status=g.metrics_status))
+    metrics.observe('agency_http_request_duration_seconds', labels, time.perf_counter() - start)
+    metrics.observe('agency_sql_statements_per_request', {'route': route}, g.metrics_statements)
+    metrics.observe('agency_orm_rows_per_request', {'route': route}, g.metrics_rows)
+
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+def finish_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+    route = metrics_route()
+    metrics.observe('agency_sql_statement_duration_seconds', {'route': route}, elapsed)
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_statements += 1
+    if elapsed * 1000 >= app.config['SLOW_QUERY_MS']:
+        metrics.inc('agency_sql_slow_statements_total', {'route': route})
+        app.logger.warning("Slow query (%.0f ms) on %s: %s", elapsed * 1000, route, ' '.join(statement.split())[:500])
+
+def discard_statement_timer(exception_context):
+    # after_cursor_execute does not fire for a failed statement
+    starts = exception_context.connection.info.get('metrics_query_start') if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+def count_loaded_row(session, instance):
+    if has_request_context() and 'metrics_start' in g:
+        g.metrics_rows += 1
+
+def enable_metrics():
+    """Install the request hooks and SQLAlchemy listeners behind /metrics.
+
+    Runs at import when AGENCY_METRICS is set; otherwise call it before the
+    app serves its first request. Calling it again is a no-op.
+    """
+    app.config['METRICS_ENABLED'] = True
+    if event.contains(Engine, 'before_cursor_execute', start_statement_timer):
+        return
+    app.before_request(start_request_metrics)
+    app.after_request(record_response_status)
+    app.teardown_request(finish_request_metrics)
+    event.listen(Engine, 'before_cursor_execute', start_statement_timer)
+    event.listen(Engine, 'after_cursor_execute', finish_statement_timer)
+    event.listen(Engine, 'handle_error', discard_statement_timer)
+    event.listen(Session, 'loaded_as_persistent', count_loaded_row)
+
+if app.config['METRICS_ENABLED']:
+    enable_metrics()
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape target; 404 unless enabled and asked from this machine."""
+    if not app.config['METRICS_ENABLED'] or request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(404)
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# ==========================================
+# ROUTES & LOGIC
+# ==========================================
+
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 200
+STREAM_BATCH_SIZE = 500          # rows fetched per keyset batch with ?limit=all
+STREAM_FLUSH_BYTES = 16 * 1024   # HTML sent per chunk when streaming a page
+
+def encode_cursor(values):
+    """Pack the sort key of the last row on a page into a URL-safe token."""
+    raw = json.dumps(values, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token, columns):
+    """Inverse of encode_cursor; returns None for a missing or bad token."""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            return None
+        parsed = []
+        for c, v in zip(columns, values):
+            if v and isinstance(c.type, db.DateTime):
+                v = datetime.fromisoformat(v)
+            elif v and isinstance(c.type, db.Date):
+                v = datetime.strptime(v, '%Y-%m-%d').date()
+            parsed.append(v)
+        return parsed
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+class StreamedRows:
+    """Every row of a listing, fetched in keyset_batches() as it is iterated.
+
+    A batch is read in full before its rows are rendered, so no read lock is
+    held while the response trickles out to a slow client; one yield_per
+    cursor over the whole listing would block writers that long under the
+    rollback-journal profile.
+
+    Doubles as the page's pager: `count` is complete once the template's
+    row loop has run, which is before the pager below the table renders.
+    """
+    streamed = True
+
+    def __init__(self, query, columns, descending, paged_url):
+        self.query = query
+        self.columns = columns
+        self.descending = descending
+        self.paged_url = paged_url
+        self.count = 0
+
+    def __iter__(self):
+        for batch in keyset_batches(self.query, self.columns, self.descending):
+            for row in batch:
+                self.count += 1
+                yield row
+
+# Stands in for NULL in nullable sort keys: a row-value comparison with
+# NULL is never true, and SQLite sorts -inf before every number and string
+KEYSET_NULL = literal(float('-inf'))
+
+def sort_keys(columns):
+    """`columns` as keyset pagination orders and compares them."""
+    return [func.coalesce(c, KEYSET_NULL) if c.nullable else c for c in columns]
+
+def after_key(columns, values, descending=False):
+    """Filter for the rows after sort key `values` in sort_keys(columns) order."""
+    key = tuple_(*sort_keys(columns))
+    bound = tuple_(*[KEYSET_NULL if v is None else literal(v, c.type) for c, v in zip(columns, values)])
+    return key < bound if descending else key > bound
+
+def keyset_batches(query, columns, descending=False, batch_size=STREAM_BATCH_SIZE):
+    """Yield every row of `query`, ordered by `columns`, in lists of `batch_size`.
+
+    Each batch is its own keyset query, fetched to the end before it is
+    yielded, so SQLite holds no read lock while the caller works through
+    it. That matters under the rollback-journal profile, where an open
+    cursor blocks every writer. The price is that the rows are not one
+    snapshot: rows written between batches may or may not appear.
+    """
+    keys = sort_keys(columns)
+    order = [k.desc() for k in keys] if descending else keys
+    batch = query.order_by(*order).limit(batch_size).all()
+    while batch:
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last = [getattr(batch[-1], c.key) for c in columns]
+        batch = query.filter(after_key(columns, last, descending)).order_by(*order).limit(batch_size).all()
+
+def keyset_page(query, columns, descending=False):
+    """Fetch one page of `query` ordered by `columns` using keyset pagination.
+
+    The `after` request arg carries the sort key of the previous page's last
+    row, so every page is an index range seek rather than an OFFSET scan.
+    `columns` must end in a unique column (the primary key) to break ties.
+    Nullable columns are compared as coalesce(column, KEYSET_NULL), which
+    keeps NULL rows in the sequence but cannot use an index on the column.
+
+    `limit=all` instead returns a StreamedRows as both rows and pager; pass
+    it to render_list() to stream the whole listing in constant memory.
+    """
+    keys = sort_keys(columns)
+    order = [k.desc() for k in keys] if descending else keys
+    args = request.args.to_dict()
+    args.pop('after', None)
+    args.update(request.view_args or {})
+    if args.get('limit') == 'all':
+        args.pop('limit')
+        rows = StreamedRows(query, columns, descending, url_for(request.endpoint, **args))
+        return rows, rows
+
+    try:
+        limit = int(request.args.get('limit', PAGE_SIZE_DEFAULT))
+    except ValueError:
+        limit = PAGE_SIZE_DEFAULT
+    limit = max(1, min(limit, PAGE_SIZE_MAX))
+
+    cursor = decode_cursor(request.args.get('after'), columns)
+    if cursor is not None:
+        query = query.filter(after_key(columns, cursor, descending))
+
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    pager = {
+        'count': min(len(rows), limit),
+        'first_url': url_for(request.endpoint, **args) if cursor is not None else None,
+        'next_url': None,
+        'all_url': None,
+    }
+    if len(rows) > limit:
+        rows = rows[:limit]
+        pager['all_url'] = url_for(request.endpoint, **dict(args, limit='all'))
+        args['after'] = encode_cursor([getattr(rows[-1], c.key) for c in columns])
+        pager['next_url'] = url_for(request.endpoint, **args)
+    return rows, pager
+
+def render_list(template_name, **context):
+    """render_template(), or a streamed response for a StreamedRows pager.
+
+    Streaming sends the header and first rows while later rows are still
+    being fetched, in pieces of about STREAM_FLUSH_BYTES, and never holds
+    more than one batch of rows or one piece of HTML in memory.
+    """
+    if not isinstance(context.get('pager'), StreamedRows):
+        return render_template(template_name, **context)
+    template = app.jinja_env.get_template(template_name)
+    app.update_template_context(context)
+
+    def generate():
+        pieces, size = [], 0
+        for piece in template.generate(context):
+            pieces.append(piece)
+            size += len(piece)
+            if size >= STREAM_FLUSH_BYTES:
+                yield ''.join(pieces)
+                pieces, size = [], 0
+        yield ''.join(pieces)
+
+    return Response(stream_with_context(generate()), mimetype='text/html')
+
+def form_date(field):
+    """Read a YYYY-MM-DD date from the posted form, or abort with 400."""
+    value = request.form.get(field) or ''
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').date()
+    except ValueError:
+        abort(400, description=f"Invalid {field} '{value}': expected YYYY-MM-DD.")
+
+def search_filter(query, columns):
+    """Apply the `q` request arg as a case-insensitive match on any of `columns`."""
+    term = request.args.get('q', '').strip()
+    if term:
+        query = query.filter(or_(*[c.contains(term, autoescape=True) for c in columns]))
+    return query
+
+@app.route('/')
+def home():
+    return render_template('home', page='home')
+
+def period_change(current, previous, label, points=False):
+    """Describe `current` against the previous window as {'text', 'trend'}.
+
+    Money figures change relatively (+12.5%); win rate, already a
+    percentage, changes in points (+4.0 pts).
+    """
+    if label is None or current is None or previous is None or (not points and not previous):
+        return {'text': 'No prior-period data', 'trend': 'none'}
+    diff = current - previous if points else (current - previous) * 100 / previous
+    trend = 'up' if diff >= 0.05 else 'down' if diff <= -0.05 else 'flat'
+    return {'text': f"{diff:+.1f}{' pts' if points else '%'} vs {label}", 'trend': trend}
+
+def compute_dashboard(timeframe):
+    """Build the KPI and chart payload for one dashboard timeframe."""
+    # --- 1. Configure Date Logic ---
+    today = datetime.today()
+    start_date_obj = None
+    
+    label_map = {
+        '1m': 'Last 30 Days',
+        '3m': 'Last 3 Months',
+        '6m': 'Last 6 Months',
+        '1y': 'Last Year',
+        'all': 'All Time'
+    }
+    selected_label = label_map.get(timeframe, 'Last 6 Months')
+
+    # Determine Start Date for Filtering
     if timeframe == '1m':
+        start_date_obj = today - timedelta(days=30)
+    elif timeframe == '3m':
+        start_date_obj = today - timedelta(days=90)
+    elif timeframe == '6m':
+        start_date_obj = today - timedelta(days=180)
+    elif timeframe == '1y':
+        start_date_obj = today - timedelta(days=365)
+    else:
+        # For 'all', we pick an old date
+        start_date_obj = datetime(1900, 1, 1)
+
+    cutoff_date_str = start_date_obj.strftime('%Y-%m-%d')
+
+    # Deltas compare against the equal-length window just before this one
+    if timeframe == 'all':
+        previous_start_obj = start_date_obj  # empty window: nothing to compare
+    else:
+        previous_start_obj = start_date_obj - (today - start_date_obj)
+    previous_cutoff_str = previous_start_obj.strftime('%Y-%m-%d')
+    compare_label = {
+        '1m': 'prior 30 days', '3m': 'prior 3 months', '6m': 'prior 6 months', '1y': 'prior year',
+    }.get(timeframe)
+
+    # --- 2. KPI Queries (Filtered by Date) ---
+    # Pending tasks and the per-category breakdown share one grouped scan
+    task_rows = db.session.query(
+        Task.category,
+        func.count(Task.id),
+        func.sum(case((Task.is_completed == False, 1), else_=0)),
+    ).group_by(Task.category).all()
+    pending_count = sum(pending or 0 for _, _, pending in task_rows)
+    active_clients = Client.query.filter_by(status='Active').count()
+    
+    # Revenue (Closed Won), pipeline (In Progress) and win/loss counts for
+    # this window and the previous one, plus the chart buckets, come from a
+    # single aggregate over the revenue rollup: one row per chart bucket,
+    # with each figure a conditional SUM over the bucket's rollup rows.
+    daily = timeframe == '1m'
+    period = RevenueRollup.period
+    if daily:
+        bucket = period
+        rows_in_range = and_(RevenueRollup.grain == 'day', period >= previous_cutoff_str)
+    elif timeframe == 'all':
+        bucket = period
+        rows_in_range = RevenueRollup.grain == 'month'
+    else:
+        # Months containing a window boundary are read from their day rows
+        # so each day lands in the right window; whole months use month rows
+        bucket = func.substr(period, 1, 7)
+        boundary_months = [
+            (d.strftime('%Y-%m-01'), (d.replace(day=1) + timedelta(days=32)).strftime('%Y-%m'))
+            for d in (previous_start_obj, start_date_obj)
+        ]
+        rows_in_range = or_(
+            and_(RevenueRollup.grain == 'month', period >= boundary_months[0][1],
+                 period != start_date_obj.strftime('%Y-%m')),
+            and_(RevenueRollup.grain == 'day',
+                 or_(*[and_(period >= first, period < after) for first, after in boundary_months])),
+        )
+    current = period >= cutoff_date_str
+    previous = and_(period >= previous_cutoff_str, period < cutoff_date_str)
+
+    def window_sum(window, status, column=RevenueRollup.amount):
+        return func.sum(case((and_(window, RevenueRollup.status == status), column), else_=0))
+
+    bucket_rows = db.session.query(
+        bucket,
+        window_sum(current, 'Closed Won'),
+        window_sum(previous, 'Closed Won'),
+        window_sum(current, 'In Progress'),
+        window_sum(previous, 'In Progress'),
+        window_sum(current, 'Closed Won', RevenueRollup.deal_count),
+        window_sum(previous, 'Closed Won', RevenueRollup.deal_count),
+        window_sum(current, 'Closed Lost', RevenueRollup.deal_count),
+        window_sum(previous, 'Closed Lost', RevenueRollup.deal_count),
+    ).filter(
+        RevenueRollup.status.in_(SALE_STATUSES), rows_in_range
+    ).group_by(bucket).order_by(bucket).all()
+
+    totals = [0] * 8
+    sales_map = {}
+    for key, *figures in bucket_rows:
+        totals = [t + f for t, f in zip(totals, figures)]
+        if figures[0]:
+            sales_map[key] = figures[0]
+    (total_revenue, previous_revenue, pipeline_value, previous_pipeline,
+     won_deals, previous_won, lost_deals, previous_lost) = totals
+
+    win_rate = won_deals * 100 / (won_deals + lost_deals) if won_deals + lost_deals else None
+    previous_win_rate = previous_won * 100 / (previous_won + previous_lost) if previous_won + previous_lost else None
+
+    # --- 3. Graph Data Generation (REAL Sales Data) ---
+    revenue_labels = []
+    revenue_data = []
+
+    if daily:
         # === Daily Breakdown for Last 30 Days ===
-        sales_map = {}
-        for s in sales_data:
-            sales_map[s.date] = sales_map.get(s.date, 0) + s.amount
-            
         current = start_date_obj
         while current <= today:
             d_str = current.strftime('%Y-%m-%d')
@@ -713,17 +1971,12 @@ def dashboard():
             current += timedelta(days=1)
     else:
         # === Monthly Breakdown ===
-        sales_map = {}
-        for s in sales_data:
-            m_key = s.date[:7]  # YYYY-MM
-            sales_map[m_key] = sales_map.get(m_key, 0) + s.amount
-            
         if timeframe == 'all':
-            if sales_data:
+            if sales_map:
                 try:
-                    first_sale_date = datetime.strptime(sales_data[0].date, '%Y-%m-%d')
-                    loop_date = first_sale_date.replace(day=1)
-                except:
+                    first_month = datetime.strptime(min(sales_map), '%Y-%m')
+                    loop_date = first_month.replace(day=1)
+                except ValueError:
                     loop_date = today.replace(day=1)
             else:
                 loop_date = today.replace(day=1)
@@ -742,57 +1995,126 @@ def dashboard():
 
     # --- 4. Task Chart Data ---
     categories = ["Meeting", "Delivery", "Outreach", "Admin", "Strategy"]
-    cat_data = [Task.query.filter_by(category=cat).count() for cat in categories]
+    cat_counts = {cat: count for cat, count, _ in task_rows}
+    # Keep the standard categories first, then any custom ones in use
+    categories += sorted(cat for cat in cat_counts if cat not in categories)
+    cat_data = [cat_counts.get(cat, 0) for cat in categories]
 
-    return render_template(
-        'dashboard', 
-        page='dashboard',
+    return dict(
         selected_timeframe=timeframe,
         selected_label=selected_label,
         pending_count=pending_count,
         active_clients=active_clients,
-        pipeline_value=f"{pipeline_value:,}",
-        current_revenue=f"{int(total_revenue):,}", 
-        category_labels=json.dumps(categories),
-        category_data=json.dumps(cat_data),
-        revenue_labels=json.dumps(revenue_labels),
-        revenue_data=json.dumps(revenue_data)
+        pipeline_value=f"{round(pipeline_value, 2):,}",
+        current_revenue=f"{int(total_revenue):,}",
+        win_rate='–' if win_rate is None else f"{win_rate:.1f}%",
+        revenue_change=period_change(total_revenue, previous_revenue, compare_label),
+        pipeline_change=period_change(pipeline_value, previous_pipeline, compare_label),
+        win_rate_change=period_change(win_rate, previous_win_rate, compare_label, points=True),
+        category_labels=categories,
+        category_data=cat_data,
+        revenue_labels=revenue_labels,
+        revenue_data=revenue_data
     )
 
+DASHBOARD_TIMEFRAMES = ('1m', '3m', '6m', '1y', 'all')
+
+def requested_timeframe():
+    timeframe = request.args.get('timeframe', '6m')
+    return timeframe if timeframe in DASHBOARD_TIMEFRAMES else '6m'
+
+@app.route('/dashboard')
+def dashboard():
+    timeframe = requested_timeframe()
+    payload = dashboard_cache.get(timeframe, compute_dashboard)
+    return render_template('dashboard', page='dashboard', **payload)
+
+@app.route('/api/dashboard')
+def dashboard_api():
+    """Dashboard KPIs and chart series as JSON, revalidated by ETag.
+
+    The tag is a hash of the payload itself, so it stays valid across
+    restarts and changes whenever the data does, whoever wrote it. The
+    payload comes from the cache, so a revalidation is still cheap.
+    """
+    payload = dashboard_cache.get(requested_timeframe(), compute_dashboard)
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    etag = hashlib.sha256(body.encode()).hexdigest()[:32]
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/cache_stats')
+def cache_stats():
+    return jsonify(dashboard_cache.stats())
+
 @app.route('/workbench')
 def workbench():
-    tasks = Task.query.order_by(Task.is_completed, Task.due_date).all()
-    return render_template('workbench', page='workbench', tasks=tasks)
+    filters = {k: request.args.get(k, '') for k in ('q', 'category', 'state')}
+    query = search_filter(Task.query, [Task.title])
+    if filters['category']:
+        query = query.filter(Task.category == filters['category'])
+    if filters['state']:
+        query = query.filter(Task.is_completed == (filters['state'] == 'done'))
+    tasks, pager = keyset_page(query, [Task.is_completed, Task.due_date, Task.id])
+    return render_list('workbench', page='workbench', tasks=tasks, filters=filters, pager=pager)
 
 @app.route('/add_task', methods=['POST'])
 def add_task():
     title = request.form.get('title')
     category = request.form.get('category')
-    due_date = request.form.get('due_date')
+    due_date = form_date('due_date')
     new_task = Task(title=title, category=category, due_date=due_date)
     db.session.add(new_task)
     db.session.commit()
-    return redirect(url_for('workbench'))
-
-@app.route('/complete/<int:id>')
-def complete_task(id):
-    task = Task.query.get_or_404(id)
-    task.is_completed = True
-    db.session.commit()
-    return redirect(url_for('workbench'))
-
-@app.route('/delete/<int:id>')
-def delete_task(id):
-    task = Task.query.get_or_404(id)
-    db.session.delete(task)
-    db.session.commit()
+    bump_data_version()
     return redirect(url_for('workbench'))
 
 # --- CLIENT ROUTES ---
 @app.route('/clients')
 def clients():
-    all_clients = Client.query.order_by(Client.created_at.desc()).all()
-    return render_template('clients', page='clients', clients=all_clients)
+    filters = {k: request.args.get(k, '') for k in ('q', 'status')}
+    query = search_filter(Client.query, [Client.name, Client.company, Client.email])
+    if filters['status']:
+        query = query.filter(Client.status == filters['status'])
+    # Newest first by id: created_at is only ever set on insert, so it
+    # follows id, and legacy values need not match the DateTime format
+    page_clients, pager = keyset_page(query, [Client.id], descending=True)
+    return render_list('clients', page='clients', clients=page_clients, filters=filters, pager=pager)
+
+@app.route('/clients/<int:id>')
+def client_detail(id):
+    client = Client.query.get_or_404(id)
+    # One aggregate over this client's rows only (ix_sale_client_date); the
+    # status totals and the monthly won series both come out of it
+    month = func.substr(Sale.date, 1, 7)
+    status = func.coalesce(Sale.status, 'In Progress')
+    totals = {}
+    monthly_won = {}
+    for period, deal_status, count, amount in db.session.execute(
+        select(month, status, func.count(Sale.id), func.sum(Sale.amount))
+        .where(Sale.client_id == id)
+        .group_by(month, status)
+        .order_by(month)
+    ):
+        deals, value = totals.get(deal_status, (0, 0))
+        totals[deal_status] = (deals + count, value + amount)
+        if deal_status == 'Closed Won':
+            monthly_won[period] = amount
+    history, pager = keyset_page(Sale.query.filter(Sale.client_id == id), [Sale.date, Sale.id], descending=True)
+    return render_list(
+        'client_detail', page='clients', client=client, history=history, pager=pager,
+        deal_count=sum(count for count, _ in totals.values()),
+        won_revenue=f"{round(totals.get('Closed Won', (0, 0))[1], 2):,}",
+        pipeline_value=f"{round(totals.get('In Progress', (0, 0))[1], 2):,}",
+        lost_value=f"{round(totals.get('Closed Lost', (0, 0))[1], 2):,}",
+        month_labels=list(monthly_won),
+        month_revenue=[round(total, 2) for total in monthly_won.values()],
+    )
 
 @app.route('/add_client', methods=['POST'])
 def add_client():
@@ -803,46 +2125,1008 @@ def add_client():
     
     new_client = Client(name=name, company=company, email=email, status=status)
     db.session.add(new_client)
+    db.session.flush()
+    # Deals recorded before the client existed were left unlinked
+    link_sales_to_clients(name)
     db.session.commit()
-    return redirect(url_for('clients'))
-
-@app.route('/delete_client/<int:id>')
-def delete_client(id):
-    client = Client.query.get_or_404(id)
-    db.session.delete(client)
-    db.session.commit()
+    bump_data_version()
     return redirect(url_for('clients'))
 
 # --- SALES ROUTES ---
+UNLINKED_COUNT_MAX = 10000  # the Sales page counts unlinked deals up to here
+
 @app.route('/sales')
 def sales():
-    all_sales = Sale.query.order_by(Sale.id.desc()).all()
-    all_clients = Client.query.all()
-    return render_template('sales', page='sales', sales=all_sales, clients=all_clients)
+    filters = {k: request.args.get(k, '') for k in ('q', 'status', 'client')}
+    query = search_filter(Sale.query, [Sale.client_name, Sale.service])
+    if filters['status']:
+        query = query.filter(Sale.status == filters['status'])
+    if filters['client'] == 'none':
+        query = query.filter(Sale.client_id.is_(None))
+    page_sales, pager = keyset_page(query, [Sale.id], descending=True)
+    # Deals whose client_name matched no client (e.g. when an upgrade linked
+    # existing sales); bounded so a large backlog cannot slow the page
+    unlinked = db.session.scalar(select(func.count()).select_from(
+        select(Sale.id).where(Sale.client_id.is_(None)).limit(UNLINKED_COUNT_MAX + 1).subquery()))
+    return render_list('sales', page='sales', sales=page_sales, filters=filters, pager=pager,
+                       unlinked=unlinked, unlinked_max=UNLINKED_COUNT_MAX)
+
+CLIENT_SUGGEST_LIMIT = 10
+
+@app.route('/api/client_names')
+def client_names():
+    """Typeahead for the Add Deal modal: client names starting with `q`."""
+    prefix = request.args.get('q', '').strip()
+    query = db.session.query(Client.name)
+    if prefix:
+        # Bind the whole pattern (not `? || '%'`) so SQLite can turn the
+        # LIKE into a range seek on ix_client_name_nocase
+        escaped = prefix.replace('/', '//').replace('%', '/%').replace('_', '/_')
+        query = query.filter(Client.name.like(escaped + '%', escape='/'))
+    names = query.distinct().order_by(collate(Client.name, 'NOCASE')).limit(CLIENT_SUGGEST_LIMIT)
+    return jsonify([name for (name,) in names])
+
+# --- REVENUE ROLLUP ---
+def rollup_buckets(status, day):
+    """The (grain, period, status) rollup rows a sale on `day` counts toward."""
+    status = status or 'In Progress'
+    return (('day', day.isoformat(), status), ('month', day.strftime('%Y-%m'), status))
+
+def apply_rollup_deltas(deltas):
+    """Upsert {(grain, period, status): (amount, deal_count)} into the rollup."""
+    stmt = sqlite_insert(RevenueRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['grain', 'status', 'period'],
+        set_={
+            'amount': RevenueRollup.amount + stmt.excluded.amount,
+            'deal_count': RevenueRollup.deal_count + stmt.excluded.deal_count,
+        },
+    )
+    db.session.execute(stmt, [
+        {'grain': grain, 'period': period, 'status': status, 'amount': amount, 'deal_count': count}
+        for (grain, period, status), (amount, count) in deltas.items()
+    ])
+
+def apply_sales_to_rollup(sales, sign):
+    """Add (sign=1) or remove (sign=-1) sales from the revenue rollup.
+
+    `sales` yields (status, date, amount) tuples; their totals are merged per
+    bucket and applied in one executemany. Runs in the caller's session, so
+    the rollup commits atomically with the sale inserts/deletes.
+    """
+    deltas = {}
+    for status, day, amount in sales:
+        for bucket in rollup_buckets(status, day):
+            total, count = deltas.get(bucket, (0, 0))
+            deltas[bucket] = (total + sign * amount, count + sign)
+    if not deltas:
+        return
+    apply_rollup_deltas(deltas)
+    if sign < 0:
+        db.session.execute(delete(RevenueRollup).where(RevenueRollup.deal_count <= 0))
+
+def fill_revenue_rollup():
+    """Replace the revenue rollup with totals from the sale table (no commit)."""
+    RevenueRollup.query.delete()
+    status = func.coalesce(Sale.status, 'In Progress')
+    for grain, period in (('day', Sale.date), ('month', func.substr(Sale.date, 1, 7))):
+        totals = select(
+            literal(grain), period, status, func.sum(Sale.amount), func.count(Sale.id)
+        ).group_by(period, status)
+        db.session.execute(insert(RevenueRollup).from_select(
+            ['grain', 'period', 'status', 'amount', 'deal_count'], totals
+        ))
+
+def rebuild_revenue_rollup():
+    """Regenerate the revenue rollup from the sale table."""
+    fill_revenue_rollup()
+    db.session.commit()
+    bump_data_version()
+
+@app.cli.command('rebuild-rollup')
+def rebuild_rollup_command():
+    """Rebuild the revenue rollup table from existing sales."""
+    rebuild_revenue_rollup()
+    print(f"Rebuilt revenue rollup: {RevenueRollup.query.count()} buckets.")
+
+def client_id_for_name(name):
+    """Id of the (oldest) client named `name`, case-insensitively, or None."""
+    return db.session.scalar(
+        select(Client.id).where(collate(Client.name, 'NOCASE') == name).order_by(Client.id).limit(1)
+    )
+
+def link_sales_to_clients(name=None):
+    """Fill in client_id for unlinked sales whose client_name matches a client.
+
+    One UPDATE with a correlated lookup on ix_client_name_nocase; run after
+    bulk imports, by the migration that introduced client_id, and by
+    add_client for just the new `name`.
+    """
+    match = (
+        select(func.min(Client.id))
+        .where(collate(Client.name, 'NOCASE') == Sale.client_name)
+        .scalar_subquery()
+    )
+    unlinked = Sale.client_id.is_(None)
+    if name is not None:
+        unlinked = and_(unlinked, collate(Sale.client_name, 'NOCASE') == name)
+    db.session.execute(update(Sale).where(unlinked).values(client_id=match))
 
 @app.route('/add_sale', methods=['POST'])
 def add_sale():
     client_name = request.form.get('client_name')
     service = request.form.get('service')
     amount = float(request.form.get('amount'))
-    date = request.form.get('date')
+    date = form_date('date')
     status = request.form.get('status')
     
-    new_sale = Sale(client_name=client_name, service=service, amount=amount, date=date, status=status)
+    new_sale = Sale(client_name=client_name, client_id=client_id_for_name(client_name),
+                    service=service, amount=amount, date=date, status=status)
     db.session.add(new_sale)
+    apply_sales_to_rollup([(new_sale.status, new_sale.date, new_sale.amount)], 1)
     db.session.commit()
+    bump_data_version()
     return redirect(url_for('sales'))
 
-@app.route('/delete_sale/<int:id>')
-def delete_sale(id):
-    sale = Sale.query.get_or_404(id)
-    db.session.delete(sale)
+# --- SEARCH ---
+# Global search runs on FTS5 tables (<table>_fts) over the text columns
+# below. They are external-content tables, so the text itself stays in the
+# base table, and triggers keep them in sync: every write path (forms,
+# bulk import and delete, migrations) updates the index in its own
+# transaction.
+SEARCH_KINDS = {
+    # kind: (model, {indexed column: rank weight})
+    'clients': (Client, {'name': 3, 'company': 2, 'email': 1}),
+    'sales': (Sale, {'client_name': 3, 'service': 2}),
+    'tasks': (Task, {'title': 1}),
+}
+SEARCH_RANKED_MAX = 20000  # matches bm25() ranks per kind (see search_kind)
+SEARCH_RESULTS = 10        # best of those shown per kind
+SEARCH_TERMS_MAX = 8
+
+# highlight() wraps matched tokens in these; HTML is added after escaping
+HIGHLIGHT_START, HIGHLIGHT_END = '\x02', '\x03'
+
+def search_index_ddl(table, columns):
+    """CREATE statements for `table`_fts and the triggers that maintain it."""
+    fts = f"{table}_fts"
+    names = ', '.join(columns)
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {', '.join('new.' + c for c in columns)});"
+    delete = (f"INSERT INTO {fts}({fts}, rowid, {names}) "
+              f"VALUES ('delete', old.id, {', '.join('old.' + c for c in columns)});")
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+def rebuild_search_index():
+    """Create any missing search tables and triggers and reindex from scratch."""
+    conn = db.session.connection()
+    for model, weights in SEARCH_KINDS.values():
+        table = model.__tablename__
+        for statement in search_index_ddl(table, list(weights)):
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    rebuild_search_index()
     db.session.commit()
-    return redirect(url_for('sales'))
+    print("Rebuilt the search index.")
+
+def search_terms(query_text):
+    """Lower-cased words of `query_text`; punctuation and FTS5 syntax dropped."""
+    return [term.lower() for term in re.findall(r'[^\W_]+', query_text)][:SEARCH_TERMS_MAX]
+
+def highlighted_html(marked):
+    """Escape a highlight() result and turn its markers into <mark> tags."""
+    html = str(escape(marked or ''))
+    return Markup(html.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
+
+def match_expression(terms):
+    """FTS5 query requiring every term, with the last one as a prefix.
+
+    Only the word still being typed is a prefix: a prefix query merges the
+    postings of every indexed word it covers before it can skip ahead, so
+    "client"* costs a pass over every sale, while the exact word "client"
+    is seeked to the few rows the other terms allow. One-character last
+    terms stay exact too (the prefix index starts at two characters).
+    """
+    phrases = [f'"{term}"' for term in terms]
+    if len(terms[-1]) > 1:
+        phrases[-1] += '*'
+    return ' '.join(phrases)
+
+def rank_floor(fts, match):
+    """Lowest rowid among the newest SEARCH_RANKED_MAX rows matching `match`,
+    or 0 if there are no more rows than that."""
+    beyond = db.session.scalar(
+        text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match ORDER BY rowid DESC LIMIT 1 OFFSET :limit"),
+        {'match': match, 'limit': SEARCH_RANKED_MAX},
+    )
+    return 0 if beyond is None else beyond + 1
+
+def search_kind(kind, terms):
+    """Best SEARCH_RESULTS matches of `kind` for `terms` (see match_expression).
+
+    Matches are ordered by bm25() with the SEARCH_KINDS column weights,
+    then newest first. bm25() scores every row it is given, so a match of
+    more than SEARCH_RANKED_MAX rows is narrowed first: to the rows
+    matching in the top-weighted column alone (a client's name, a deal's
+    client), if any, and to the newest SEARCH_RANKED_MAX of those. A word
+    in every one of 1M sales then takes about 0.2 s instead of 1 s. The
+    window does not bound the rest: bm25() weights each phrase by reading
+    its whole doclist, and a prefix longer than the prefix index is merged
+    from every word it covers first, so a common word stays in the tens to
+    hundreds of ms at 1M rows (see README).
+
+    Returns ([(id, {column: highlighted html})], narrowed).
+    """
+    model, weights = SEARCH_KINDS[kind]
+    fts = f"{model.__tablename__}_fts"
+    highlights = ', '.join(f"highlight({fts}, {i}, char(2), char(3))" for i in range(len(weights)))
+    rank = f"bm25({fts}, {', '.join(str(weight) for weight in weights.values())})"
+
+    def best(match, floor):
+        return db.session.execute(
+            text(f"SELECT rowid, {highlights} FROM {fts} WHERE {fts} MATCH :match AND rowid >= :floor "
+                 f"ORDER BY {rank}, rowid DESC LIMIT :limit"),
+            {'match': match, 'floor': floor, 'limit': SEARCH_RESULTS},
+        ).all()
+
+    match = match_expression(terms)
+    floor = rank_floor(fts, match)
+    rows = None
+    if floor and len(weights) > 1:
+        top = f"{{{next(iter(weights))}}} : ({match})"
+        rows = best(top, rank_floor(fts, top))
+    if not rows:
+        rows = best(match, floor)
+    return [(row[0], {column: highlighted_html(marked) for column, marked in zip(weights, row[1:])})
+            for row in rows], bool(floor)
+
+def search_url(kind, obj):
+    if kind == 'clients':
+        return url_for('client_detail', id=obj.id)
+    if kind == 'sales':
+        if obj.client_id:
+            return url_for('client_detail', id=obj.client_id)
+        return url_for('sales', q=obj.client_name)
+    return url_for('workbench', q=obj.title)
+
+def search_all(query_text):
+    """{kind: [{'id', 'url', 'fields', 'obj'}]} for every SEARCH_KINDS kind,
+    and the kinds whose matches were narrowed before ranking."""
+    terms = search_terms(query_text)
+    results, narrowed = {}, []
+    for kind, (model, _) in SEARCH_KINDS.items():
+        hits, partial = search_kind(kind, terms) if terms else ([], False)
+        if partial:
+            narrowed.append(kind)
+        objects = {}
+        if hits:
+            objects = {obj.id: obj for obj in model.query.filter(model.id.in_([id for id, _ in hits]))}
+        results[kind] = [
+            {'id': id, 'url': search_url(kind, objects[id]), 'fields': fields, 'obj': objects[id]}
+            for id, fields in hits if id in objects
+        ]
+    return results, narrowed
+
+@app.route('/search')
+def search():
+    q = request.args.get('q', '').strip()
+    results, narrowed = search_all(q)
+    return render_template('search', page='search', q=q, results=results, narrowed=narrowed,
+                           ranked_max=SEARCH_RANKED_MAX)
+
+@app.route('/api/search')
+def search_api():
+    """Search results as JSON; matched words in `fields` are wrapped in <mark>.
+
+    `narrowed` lists the kinds with too many matches to rank them all.
+    """
+    results, narrowed = search_all(request.args.get('q', '').strip())
+    return jsonify({
+        **{kind: [{'id': hit['id'], 'url': hit['url'], 'fields': {k: str(v) for k, v in hit['fields'].items()}}
+                  for hit in hits]
+           for kind, hits in results.items()},
+        'narrowed': narrowed,
+    })
+
+# --- BULK ACTIONS ---
+BULK_IDS_MAX = 1000  # well under SQLite's 32766 bound-parameter limit
+app.jinja_env.globals['BULK_IDS_MAX'] = BULK_IDS_MAX  # select-all stops there
+
+def posted_ids():
+    """Ids posted as repeated `ids` fields (row checkboxes); 400 on junk."""
+    values = request.form.getlist('ids')
+    if len(values) > BULK_IDS_MAX:
+        abort(400, description=f"Too many rows selected ({len(values)}): bulk actions take "
+                               f"at most {BULK_IDS_MAX} at a time. Select fewer rows and repeat.")
+    try:
+        return {int(v) for v in values}
+    except ValueError:
+        abort(400)
+
+def redirect_back(endpoint):
+    """Redirect to the posted `next` page (keeps filters/cursor) or `endpoint`."""
+    target = request.form.get('next', '')
+    if not target.startswith('/') or target.startswith('//'):
+        target = url_for(endpoint)
+    return redirect(target)
+
+def complete_tasks(ids):
+    db.session.execute(
+        update(Task).where(Task.id.in_(ids), Task.is_completed.is_not(True)).values(is_completed=True)
+    )
+
+def delete_tasks(ids):
+    db.session.execute(delete(Task).where(Task.id.in_(ids)))
+
+def delete_clients(ids):
+    # Deals stay (with their client_name) but no longer point at the client
+    db.session.execute(update(Sale).where(Sale.client_id.in_(ids)).values(client_id=None))
+    db.session.execute(delete(Client).where(Client.id.in_(ids)))
+
+def delete_sales(ids):
+    removed = db.session.execute(
+        delete(Sale).where(Sale.id.in_(ids)).returning(Sale.status, Sale.date, Sale.amount)
+    ).all()
+    apply_sales_to_rollup(removed, -1)
+
+# kind -> (list page endpoint, {action: handler})
+BULK_ACTIONS = {
+    'tasks': ('workbench', {'complete': complete_tasks, 'delete': delete_tasks}),
+    'clients': ('clients', {'delete': delete_clients}),
+    'sales': ('sales', {'delete': delete_sales}),
+}
+
+@app.route('/bulk/<kind>', methods=['POST'])
+def bulk_action(kind):
+    """Apply one action to every posted id with a single UPDATE/DELETE ... IN."""
+    if kind not in BULK_ACTIONS:
+        abort(404)
+    endpoint, actions = BULK_ACTIONS[kind]
+    handler = actions.get(request.form.get('action'))
+    if handler is None:
+        abort(400)
+    ids = posted_ids()
+    if ids:
+        handler(ids)
+        db.session.commit()
+        bump_data_version()
+    return redirect_back(endpoint)
 
 # ==========================================
-# INITIALIZATION HELPERS (for desktop + dev)
+# BULK IMPORT / EXPORT
+# ==========================================
+# CSV and JSON in and out for clients, sales and tasks. Imports are parsed
+# record by record and inserted IMPORT_BATCH_SIZE rows per executemany and
+# commit; exports stream rows out as the database cursor yields them.
+IMPORT_BATCH_SIZE = 1000
+IMPORT_ERROR_LIMIT = 100  # per-row errors listed in the report; the rest are counted
+EXPORT_BATCH_SIZE = 1000
+
+CLIENT_STATUSES = ('Lead', 'Active', 'Churned')
+SALE_STATUSES = ('In Progress', 'Closed Won', 'Closed Lost')
+
+def import_text(max_length, required=False):
+    def convert(value):
+        value = '' if value is None else str(value).strip()
+        if not value:
+            if required:
+                raise ValueError("is required")
+            return None
+        if len(value) > max_length:
+            raise ValueError(f"is longer than {max_length} characters")
+        return value
+    return convert
+
+def import_choice(choices, default):
+    def convert(value):
+        value = '' if value is None else str(value).strip()
+        if not value:
+            return default
+        if value not in choices:
+            raise ValueError(f"must be one of {', '.join(choices)}")
+        return value
+    return convert
+
+def import_amount(value):
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{value!r} is not a number")
+    if amount != amount or amount in (float('inf'), float('-inf')):
+        raise ValueError(f"{value!r} is not a number")
+    return amount
+
+def import_date(value):
+    parsed = parse_legacy_date(value)
+    if parsed is None:
+        raise ValueError(f"{value!r} is not a date")
+    return parsed
+
+def import_bool(value):
+    if isinstance(value, bool):
+        return value
+    value = '' if value is None else str(value).strip().lower()
+    if value in ('', '0', 'false', 'no', 'n'):
+        return False
+    if value in ('1', 'true', 'yes', 'y'):
+        return True
+    raise ValueError(f"{value!r} is not true/false")
+
+# kind -> (model, {column: converter}); unknown columns (id, created_at) are ignored
+BULK_KINDS = {
+    'clients': (Client, {
+        'name': import_text(100, required=True),
+        'company': import_text(100),
+        'email': import_text(100),
+        'status': import_choice(CLIENT_STATUSES, 'Lead'),
+    }),
+    'sales': (Sale, {
+        'client_name': import_text(100, required=True),
+        'service': import_text(100, required=True),
+        'amount': import_amount,
+        'status': import_choice(SALE_STATUSES, 'In Progress'),
+        'date': import_date,
+    }),
+    'tasks': (Task, {
+        'title': import_text(100, required=True),
+        'category': import_text(50, required=True),
+        'due_date': import_date,
+        'is_completed': import_bool,
+    }),
+}
+
+def data_format(filename):
+    """'csv' or 'json' from a file name's extension, else None."""
+    ext = os.path.splitext(filename or '')[1].lower()
+    return {'.csv': 'csv', '.json': 'json', '.jsonl': 'json', '.ndjson': 'json'}.get(ext)
+
+def iter_csv_records(stream):
+    """Yield (line number, dict) per CSV row; the first row is the header."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    for record in reader:
+        yield reader.line_num, record
+
+def iter_json_records(stream, chunk_size=64 * 1024):
+    """Yield (record number, value) from a JSON array or JSON Lines stream.
+
+    Values are decoded one at a time from a sliding buffer, so memory is
+    bounded by the largest record rather than by the file.
+    """
+    reader = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    decoder = json.JSONDecoder()
+    buffer = ''
+    number = 0
+    eof = False
+    while True:
+        # Array brackets and separators between records are skipped, which
+        # also accepts JSON Lines (records separated by newlines)
+        buffer = buffer.lstrip(' \t\r\n[],')
+        if not buffer:
+            if eof:
+                return
+            chunk = reader.read(chunk_size)
+            eof = not chunk
+            buffer = chunk
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError(f"invalid JSON after record {number}")
+            chunk = reader.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+        number += 1
+        yield number, value
+        buffer = buffer[end:]
+
+def read_records(stream, fmt):
+    return iter_csv_records(stream) if fmt == 'csv' else iter_json_records(stream)
+
+def import_rows(kind, records, report=None, checkpoint=None):
+    """Validate (row, record) pairs and insert them in batched transactions.
+
+    Invalid rows are skipped and reported; valid rows are committed every
+    IMPORT_BATCH_SIZE rows. A malformed file stops the import after the
+    rows read so far. Returns a JSON-ready report.
+
+    Import jobs pass the `report` of an interrupted run to continue it, and
+    a `checkpoint(row, report)` that runs inside each batch's transaction,
+    with the last row the batch covers, to record where to resume.
+    """
+    model, fields = BULK_KINDS[kind]
+    report = report or {'inserted': 0, 'error_count': 0, 'errors': []}
+    batch = []
+
+    def flush(row):
+        db.session.execute(insert(model), batch)  # executemany
+        if model is Sale:
+            apply_sales_to_rollup(((r['status'], r['date'], r['amount']) for r in batch), 1)
+        report['inserted'] += len(batch)
+        if checkpoint:
+            checkpoint(row, report)
+        db.session.commit()
+        batch.clear()
+
+    try:
+        for row, record in records:
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("expected an object of column values")
+                values = {}
+                for name, convert in fields.items():
+                    try:
+                        values[name] = convert(record.get(name))
+                    except ValueError as exc:
+                        raise ValueError(f"{name} {exc}")
+            except ValueError as exc:
+                report['error_count'] += 1
+                if len(report['errors']) < IMPORT_ERROR_LIMIT:
+                    report['errors'].append({'row': row, 'error': str(exc)})
+                continue
+            batch.append(values)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush(row)
+    except (ValueError, csv.Error) as exc:
+        report['aborted'] = str(exc)
+    if batch:
+        flush(row)
+    if report['inserted'] and model in (Sale, Client):
+        link_sales_to_clients()
+        db.session.commit()
+    if report['inserted']:
+        bump_data_version()
+    return report
+
+def export_chunks(kind, fmt):
+    """Yield a CSV or JSON export of every row of `kind`, in id order.
+
+    Read in keyset_batches(), so no read lock is held between chunks.
+    """
+    model = BULK_KINDS[kind][0]
+    columns = list(model.__table__.columns)
+    batches = keyset_batches(db.session.query(*columns), [model.id], batch_size=EXPORT_BATCH_SIZE)
+    names = [c.name for c in columns]
+    if fmt == 'csv':
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(names)
+        for rows in batches:
+            writer.writerows(rows)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+        yield out.getvalue()
+    else:
+        separator = '[\n'
+        for rows in batches:
+            yield ''.join(
+                (separator if i == 0 else ',\n') + json.dumps(dict(zip(names, row)), default=str)
+                for i, row in enumerate(rows)
+            )
+            separator = ',\n'
+        yield '[]\n' if separator == '[\n' else '\n]\n'
+
+@app.route('/import/<kind>', methods=['POST'])
+def import_data(kind):
+    if kind not in BULK_KINDS:
+        abort(404)
+    upload = request.files.get('file')
+    fmt = request.args.get('format') or data_format(upload.filename if upload else None)
+    if upload is None or fmt not in ('csv', 'json'):
+        abort(400)
+    return jsonify(import_rows(kind, read_records(upload.stream, fmt)))
+
+@app.route('/export/<kind>.<fmt>')
+def export_data(kind, fmt):
+    if kind not in BULK_KINDS or fmt not in ('csv', 'json'):
+        abort(404)
+    return Response(
+        stream_with_context(export_chunks(kind, fmt)),
+        mimetype='text/csv' if fmt == 'csv' else 'application/json',
+        headers={'Content-Disposition': f'attachment; filename={kind}.{fmt}'},
+    )
+
+@app.cli.command('import-data')
+@click.argument('kind', type=click.Choice(sorted(BULK_KINDS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_data_command(kind, path):
+    """Bulk import clients, sales or tasks from a .csv or .json file."""
+    fmt = data_format(path)
+    if fmt is None:
+        raise click.UsageError("PATH must end in .csv, .json, .jsonl or .ndjson")
+    with open(path, 'rb') as f:
+        report = import_rows(kind, read_records(f, fmt))
+    print(f"Imported {report['inserted']} {kind}; {report['error_count']} rows rejected.")
+    for error in report['errors']:
+        print(f"  row {error['row']}: {error['error']}")
+    if 'aborted' in report:
+        print(f"Stopped early: {report['aborted']}")
+
+@app.cli.command('export-data')
+@click.argument('kind', type=click.Choice(sorted(BULK_KINDS)))
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+def export_data_command(kind, path):
+    """Export all clients, sales or tasks to a .csv or .json file."""
+    fmt = data_format(path)
+    if fmt is None:
+        raise click.UsageError("PATH must end in .csv or .json")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for chunk in export_chunks(kind, fmt):
+            f.write(chunk)
+    print(f"Exported {kind} to {path}.")
+
+# ==========================================
+# BACKGROUND JOBS
+# ==========================================
+# Slow maintenance (rebuilds, VACUUM/ANALYZE, backups, imports, exports to
+# file) runs on a small pool of worker threads instead of in a request.
+# Each job is a Job row. report_progress() shows progress on /api/jobs at
+# once and saves it in the row every JOB_PROGRESS_INTERVAL seconds, through
+# the handler's own session, so handlers report between batches and never
+# while a cursor is open (a second connection would wait on that cursor
+# under the rollback journal). The UI polls /api/jobs. Workers are daemon
+# threads, so closing the app never waits on a job: whatever was queued or
+# running is picked up again by resume_jobs() at the next start, and every
+# handler is safe to rerun.
+JOB_WORKERS = int(os.environ.get('AGENCY_JOB_WORKERS', 2))
+JOB_DIR = os.path.join(basedir, 'jobs')        # uploaded imports, finished exports
+BACKUP_DIR = os.path.join(basedir, 'backups')
+JOB_ACTIVE = ('queued', 'running')
+JOB_PROGRESS_INTERVAL = 1.0  # seconds between saves of a running job's progress
+JOBS_LISTED = 20
+
+class JobRunner:
+    """Queue of Job ids served by JOB_WORKERS daemon threads.
+
+    Threads start with the first job. Each runs the job's handler in its
+    own app context (so its own session and connection) and records
+    running / done / failed with the handler's result or error, plus the
+    last progress the handler reported.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+        self._live = {}  # job id -> {'progress', 'total', 'message'} while running
+        self._saved = {}  # job id -> time.monotonic() of the last progress save
+        self._lock = threading.Lock()
+
+    def report(self, job_id, **fields):
+        """Update a running job's live progress; True when it is due a save."""
+        now = time.monotonic()
+        with self._lock:
+            self._live.setdefault(job_id, {}).update(fields)
+            if now - self._saved.get(job_id, 0) < JOB_PROGRESS_INTERVAL:
+                return False
+            self._saved[job_id] = now
+            return True
+
+    def status(self, job):
+        """job.to_dict() with the in-memory progress of a running job."""
+        with self._lock:
+            live = dict(self._live.get(job.id, {}))
+        return {**job.to_dict(), **live}
+
+    def submit(self, kind, params=None):
+        """Persist a queued Job and hand it to the pool; returns the Job."""
+        job = Job(kind=kind, params=json.dumps(params or {}))
+        db.session.add(job)
+        db.session.commit()
+        self._enqueue(job.id)
+        return job
+
+    def resume(self):
+        """Requeue the jobs a previous run left queued or running."""
+        ids = db.session.scalars(select(Job.id).where(Job.status.in_(JOB_ACTIVE)).order_by(Job.id)).all()
+        for job_id in ids:
+            self._enqueue(job_id)
+        return len(ids)
+
+    def _enqueue(self, job_id):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'agency-job-{len(self._threads)}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        self._queue.put(job_id)
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                with app.app_context():
+                    self._run(job_id)
+            except Exception:
+                app.logger.exception("Job %s could not be recorded", job_id)
+
+    def _run(self, job_id):
+        job = db.session.get(Job, job_id)
+        if job is None or job.status not in JOB_ACTIVE:
+            return
+        job.status = 'running'
+        job.started_at = job.started_at or datetime.utcnow()
+        db.session.commit()
+        try:
+            result = JOB_HANDLERS[job.kind](job, **json.loads(job.params))
+        except Exception as exc:
+            db.session.rollback()
+            app.logger.exception("Job %s (%s) failed", job_id, job.kind)
+            job = db.session.get(Job, job_id)
+            self._save_progress(job)
+            job.status = 'failed'
+            job.message = str(exc)[:200]
+        else:
+            job = db.session.get(Job, job_id)
+            self._save_progress(job)
+            job.status = 'done'
+            job.result = json.dumps(result, default=str)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        bump_data_version()
+
+    def _save_progress(self, job):
+        with self._lock:
+            live = self._live.pop(job.id, {})
+            self._saved.pop(job.id, None)
+        for name, value in live.items():
+            if value is not None:
+                setattr(job, name, value)
+
+job_runner = JobRunner(JOB_WORKERS)
+
+def resume_jobs():
+    """Restart jobs interrupted by the last shutdown; returns how many."""
+    count = job_runner.resume()
+    if count:
+        print(f"Resuming {count} background job(s).")
+    return count
+
+def report_progress(job, done, total=None, message=None):
+    """Record a running job's progress for /api/jobs, saving it when due.
+
+    Saving commits the handler's session: call this between units of work,
+    not while iterating a query (use keyset_batches() for long reads).
+    """
+    fields = {'progress': done, 'message': message}
+    if total is not None:
+        fields['total'] = total
+    if job_runner.report(job.id, **fields):
+        values = {name: value for name, value in fields.items() if value is not None}
+        db.session.execute(update(Job).where(Job.id == job.id).values(**values))
+        db.session.commit()
+
+def job_rebuild_rollup(job):
+    report_progress(job, 0, 1, "Rebuilding revenue rollup")
+    rebuild_revenue_rollup()
+    buckets = db.session.scalar(select(func.count(RevenueRollup.id)))
+    report_progress(job, 1, 1, f"{buckets} buckets")
+    return {'buckets': buckets}
+
+def job_rebuild_search_index(job):
+    report_progress(job, 0, 1, "Reindexing")
+    rebuild_search_index()
+    db.session.commit()
+    report_progress(job, 1, 1, "Search index rebuilt")
+    return {}
+
+def database_path():
+    return db.engine.url.database
+
+def database_size():
+    """Bytes on disk: agency.db plus its WAL, after checkpointing the WAL.
+
+    Under the WAL profile VACUUM writes the new file into agency.db-wal;
+    the main file only shrinks once a checkpoint copies it back, and a
+    checkpoint blocked by a reader leaves pages in the WAL, so both count.
+    """
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    path = database_path()
+    return sum(os.path.getsize(name) for name in (path, path + '-wal') if os.path.exists(name))
+
+def job_optimize(job):
+    """ANALYZE, merge the FTS5 segments, then VACUUM; reports the size saved."""
+    before = database_size()
+    steps = [('ANALYZE', ["ANALYZE"])]
+    steps.append(('Optimizing search index', [
+        f"INSERT INTO {model.__tablename__}_fts({model.__tablename__}_fts) VALUES ('optimize')"
+        for model, _ in SEARCH_KINDS.values()]))
+    steps.append(('VACUUM', ["VACUUM"]))
+    for number, (label, statements) in enumerate(steps):
+        report_progress(job, number, len(steps), label)
+        # VACUUM cannot run inside a transaction; pysqlite opens none for these
+        with db.engine.connect() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            conn.commit()
+    after = database_size()
+    report_progress(job, len(steps), len(steps), f"{before - after:,} bytes reclaimed")
+    return {'bytes_before': before, 'bytes_after': after}
+
+def job_backup(job):
+    """Write a compacted, consistent copy of the database to BACKUP_DIR."""
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    name = f"agency-{job.created_at:%Y%m%d-%H%M%S}-{job.id}.db"
+    path = os.path.join(BACKUP_DIR, name)
+    if os.path.exists(path):  # left over from an interrupted run
+        os.remove(path)
+    report_progress(job, 0, 1, f"Writing {name}")
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM INTO ?", (path,))
+    size = os.path.getsize(path)
+    report_progress(job, 1, 1, f"{name} ({size:,} bytes)")
+    return {'file': name, 'path': path, 'bytes': size}
+
+def job_export(job, kind, fmt):
+    """Write export_chunks() to JOB_DIR; downloadable from /jobs/<id>/download."""
+    model = BULK_KINDS[kind][0]
+    total = db.session.scalar(select(func.count(model.id)))
+    os.makedirs(JOB_DIR, exist_ok=True)
+    name = f"{kind}-{job.id}.{fmt}"
+    done = 0
+    with open(os.path.join(JOB_DIR, name), 'w', encoding='utf-8', newline='') as out:
+        for chunk in export_chunks(kind, fmt):
+            out.write(chunk)
+            done = min(total, done + EXPORT_BATCH_SIZE)
+            report_progress(job, done, total, f"Exporting {kind}")
+    report_progress(job, total, total, f"Exported {total} {kind}")
+    return {'file': name, 'rows': total, 'download': True}
+
+def job_import(job, kind, fmt, file):
+    """import_rows() from an uploaded file, resuming after the last committed batch."""
+    path = os.path.join(JOB_DIR, file)
+    resume_after = job.progress
+    report = json.loads(job.result) if job.result else None
+
+    def checkpoint(row, report):
+        # Saved in the batch's own transaction: this is where a restart
+        # resumes, so only the message is kept in memory
+        job.progress = row
+        job.result = json.dumps(report)
+        job_runner.report(job.id, message=f"{report['inserted']} rows imported")
+
+    try:
+        with open(path, 'rb') as stream:
+            records = ((row, record) for row, record in read_records(stream, fmt) if row > resume_after)
+            report = import_rows(kind, records, report, checkpoint)
+    finally:
+        # Done or failed, the job will not read it again; only a restart
+        # (which never gets here) resumes from it
+        if os.path.exists(path):
+            os.remove(path)
+    job_runner.report(job.id, message=f"{report['inserted']} rows imported, {report['error_count']} rejected")
+    return report
+
+JOB_HANDLERS = {
+    'rebuild-rollup': job_rebuild_rollup,
+    'rebuild-search-index': job_rebuild_search_index,
+    'optimize': job_optimize,
+    'backup': job_backup,
+    'export': job_export,
+    'import': job_import,
+}
+
+@app.route('/jobs')
+def jobs():
+    recent = Job.query.order_by(Job.id.desc()).limit(JOBS_LISTED)
+    return render_template('jobs', page='jobs', jobs=[job_runner.status(job) for job in recent])
+
+@app.route('/api/jobs')
+def jobs_api():
+    return jsonify([job_runner.status(job) for job in Job.query.order_by(Job.id.desc()).limit(JOBS_LISTED)])
+
+@app.route('/api/jobs/<int:id>')
+def job_api(id):
+    return jsonify(job_runner.status(Job.query.get_or_404(id)))
+
+@app.route('/jobs/<kind>', methods=['POST'])
+def start_job(kind):
+    """Queue a job and return it (202); poll /api/jobs/<id> for progress."""
+    if kind not in JOB_HANDLERS:
+        abort(404)
+    params = {}
+    if kind in ('export', 'import'):
+        params['kind'] = request.form.get('kind')
+        if params['kind'] not in BULK_KINDS:
+            abort(400)
+    if kind == 'export':
+        params['fmt'] = request.form.get('fmt')
+        if params['fmt'] not in ('csv', 'json'):
+            abort(400)
+    elif kind == 'import':
+        upload = request.files.get('file')
+        params['fmt'] = request.form.get('format') or data_format(upload.filename if upload else None)
+        if upload is None or params['fmt'] not in ('csv', 'json'):
+            abort(400)
+        # Saved first so a restarted job can read it again
+        os.makedirs(JOB_DIR, exist_ok=True)
+        params['file'] = f"upload-{datetime.utcnow():%Y%m%d%H%M%S%f}.{params['fmt']}"
+        upload.save(os.path.join(JOB_DIR, params['file']))
+    job = job_runner.submit(kind, params)
+    return jsonify(job_runner.status(job)), 202
+
+@app.route('/jobs/<int:id>/download')
+def job_download(id):
+    job = Job.query.get_or_404(id)
+    result = json.loads(job.result) if job.result else {}
+    if job.status != 'done' or not result.get('download'):
+        abort(404)
+    return send_from_directory(JOB_DIR, result['file'], as_attachment=True)
+
+# --- QUARANTINE ---
+# Rows a migration could not convert (see migrate_date_columns) wait in
+# QuarantinedRow. The sidebar shows how many; /quarantine lists them and
+# puts one back once the user supplies the value that was unreadable.
+QUARANTINE_DATE_COLUMNS = {'sale': 'date', 'task': 'due_date'}
+
+@app.template_global()
+def quarantined_count():
+    return db.session.scalar(select(func.count(QuarantinedRow.id)))
+
+@app.route('/quarantine')
+def quarantine():
+    rows = [{'id': row.id, 'table_name': row.table_name, 'row_id': row.row_id,
+             'reason': row.reason, 'payload': json.loads(row.payload)}
+            for row in QuarantinedRow.query.order_by(QuarantinedRow.id)]
+    return render_template('quarantine', page='quarantine', rows=rows)
+
+@app.route('/quarantine/<int:id>/restore', methods=['POST'])
+def restore_quarantined(id):
+    """Re-insert a quarantined row with the corrected date from the form."""
+    row = QuarantinedRow.query.get_or_404(id)
+    table = db.metadata.tables[row.table_name]
+    fixed = form_date('date')
+    values = json.loads(row.payload)
+    values[QUARANTINE_DATE_COLUMNS[row.table_name]] = fixed.isoformat()
+    # Columns added since the row was set aside take their defaults
+    values = {name: value for name, value in values.items() if name in table.columns}
+    if db.session.scalar(select(table.c.id).where(table.c.id == values['id'])) is not None:
+        del values['id']
+    if row.table_name == 'sale':
+        values['client_id'] = client_id_for_name(values['client_name'])
+        apply_sales_to_rollup([(values['status'], fixed, values['amount'])], 1)
+    # Raw SQL, like the migration: the other values go back exactly as stored
+    db.session.execute(
+        text(f"INSERT INTO {row.table_name} ({', '.join(values)}) "
+             f"VALUES ({', '.join(':' + name for name in values)})"),
+        values,
+    )
+    db.session.delete(row)
+    db.session.commit()
+    bump_data_version()
+    return redirect(url_for('quarantine'))
+
+@app.route('/quarantine/<int:id>/discard', methods=['POST'])
+def discard_quarantined(id):
+    db.session.delete(QuarantinedRow.query.get_or_404(id))
+    db.session.commit()
+    return redirect(url_for('quarantine'))
+
 # ==========================================
+# SCHEMA MIGRATIONS
+# ==========================================
+# agency.db records how many of MIGRATIONS it has applied in PRAGMA
+# user_version. Startup reads that one integer; when it is current nothing
+# else is touched. Pending steps run in order inside a single transaction,
+# so an upgrade either completes or leaves the file as it was.
+#
+# Append new steps to the end and never edit or reorder released ones.
+# That includes their effect: step 1 runs frozen DDL (SCHEMA_V1) rather
+# than create_all(), and a model change that should reach existing files
+# gets a new step. Databases written before versioning (user_version 0)
+# replay every step, so steps must tolerate objects that already exist.
+
 def seed_financials_dynamically():
     """Generates data for the LAST 6 MONTHS relative to today."""
     print("Generating fresh financial data...")
@@ -858,40 +3142,413 @@ def seed_financials_dynamically():
             rev -= 3000
         seeds.append(Financial(month=month_name, revenue=rev, order_index=6-i))
     db.session.add_all(seeds)
-    db.session.commit()
 
+# Formats accepted from legacy free-text date columns, tried in order
+# (day-first wins over month-first for ambiguous d/m/Y values)
+LEGACY_DATE_FORMATS = (
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S.%f',
+    '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d %b %Y', '%b %d, %Y',
+)
+
+def parse_legacy_date(value):
+    """Parse a legacy date string; returns None if no known format matches."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    for fmt in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def table_columns(table):
+    return {row[1] for row in db.session.execute(text(f"PRAGMA table_info({table})"))}
+
+def add_column_if_missing(table, column_ddl):
+    """ALTER TABLE ... ADD COLUMN unless the column is already there."""
+    if column_ddl.split()[0] not in table_columns(table):
+        db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column_ddl}"))
+
+# The schema as released with step 1, frozen. Later columns, tables and
+# indexes come from the steps that introduced them.
+SCHEMA_V1 = (
+    """CREATE TABLE IF NOT EXISTS client (
+        id INTEGER NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        company VARCHAR(100),
+        email VARCHAR(100),
+        status VARCHAR(20),
+        created_at DATETIME,
+        PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_client_status_created ON client (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_client_created ON client (created_at)",
+    'CREATE INDEX IF NOT EXISTS ix_client_name_nocase ON client (name COLLATE "NOCASE")',
+    """CREATE TABLE IF NOT EXISTS financial (
+        id INTEGER NOT NULL,
+        month VARCHAR(20) NOT NULL,
+        revenue FLOAT NOT NULL,
+        order_index INTEGER,
+        PRIMARY KEY (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS quarantined_row (
+        id INTEGER NOT NULL,
+        table_name VARCHAR(50) NOT NULL,
+        row_id INTEGER NOT NULL,
+        payload TEXT NOT NULL,
+        reason VARCHAR(200) NOT NULL,
+        created_at DATETIME,
+        PRIMARY KEY (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS revenue_rollup (
+        id INTEGER NOT NULL,
+        grain VARCHAR(5) NOT NULL,
+        period VARCHAR(10) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        amount FLOAT NOT NULL,
+        deal_count INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_rollup_grain_status_period UNIQUE (grain, status, period)
+    )""",
+    """CREATE TABLE IF NOT EXISTS sale (
+        id INTEGER NOT NULL,
+        client_name VARCHAR(100) NOT NULL,
+        service VARCHAR(100) NOT NULL,
+        amount FLOAT NOT NULL,
+        status VARCHAR(20),
+        date DATE NOT NULL,
+        PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_sale_status_date ON sale (status, date)",
+    """CREATE TABLE IF NOT EXISTS task (
+        id INTEGER NOT NULL,
+        title VARCHAR(100) NOT NULL,
+        category VARCHAR(50) NOT NULL,
+        due_date DATE NOT NULL,
+        is_completed BOOLEAN,
+        created_at DATETIME,
+        PRIMARY KEY (id)
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_task_category ON task (category)",
+    "CREATE INDEX IF NOT EXISTS ix_task_completed_due ON task (is_completed, due_date)",
+)
+
+def migrate_create_tables():
+    """Create missing tables and indexes."""
+    for statement in SCHEMA_V1:
+        db.session.execute(text(statement))
+
+def migrate_date_columns():
+    """Rewrite Sale.date / Task.due_date values that are not ISO dates.
+
+    Parseable values are normalized to YYYY-MM-DD in place. Rows that cannot
+    be parsed are moved to QuarantinedRow (the Date type cannot load them);
+    the app lists them under "Needs repair" (/quarantine) until the user
+    restores them with a corrected date or discards them.
+    """
+    for table, column in (('sale', 'date'), ('task', 'due_date')):
+        # Raw SQL: these rows would fail to load through the Date type. The
+        # '+0 days' modifier forces normalization, so 2024-02-30 is caught too.
+        bad_rows = db.session.execute(text(
+            f"SELECT * FROM {table} WHERE date({column}, '+0 days') IS NOT {column}"
+        )).mappings().all()
+        for row in bad_rows:
+            parsed = parse_legacy_date(row[column])
+            if parsed is not None:
+                db.session.execute(
+                    text(f"UPDATE {table} SET {column} = :value WHERE id = :id"),
+                    {'value': parsed.isoformat(), 'id': row['id']},
+                )
+                continue
+            print(f"Date migration: {table} #{row['id']} has unparseable {column} "
+                  f"{row[column]!r}; moved to /quarantine for repair.")
+            db.session.add(QuarantinedRow(
+                table_name=table,
+                row_id=row['id'],
+                payload=json.dumps(dict(row), default=str),
+                reason=f"unparseable {column}",
+            ))
+            db.session.execute(text(f"DELETE FROM {table} WHERE id = :id"), {'id': row['id']})
+        if bad_rows:
+            print(f"Date migration: checked {len(bad_rows)} {table} rows with non-ISO {column}.")
+
+def migrate_revenue_rollup():
+    """Build the revenue rollup from existing sales."""
+    fill_revenue_rollup()
+
+def migrate_seed_data():
+    """Seed sample financials and tasks into an empty database."""
+    if Financial.query.count() != 6:
+        seed_financials_dynamically()
+    if Task.query.count() == 0:
+        db.session.add_all([
+            Task(title="Q3 Strategy Call", category="Meeting", due_date=datetime(2023, 11, 1).date()),
+            Task(title="Deliver Mockups", category="Delivery", due_date=datetime(2023, 11, 5).date()),
+        ])
+
+def migrate_sale_client_id():
+    """Link sales to clients through an indexed sale.client_id.
+
+    Sales whose client_name matches no client stay unlinked; the Sales
+    page counts them and lists them under ?client=none.
+    """
+    add_column_if_missing('sale', 'client_id INTEGER REFERENCES client (id)')
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_sale_status_date ON sale (status, date)"))
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_sale_client_date ON sale (client_id, date)"))
+    link_sales_to_clients()
+
+def migrate_search_index():
+    """Add FTS5 search indexes on clients, sales and tasks, kept in sync by triggers."""
+    rebuild_search_index()
+
+def migrate_job_table():
+    """Add the job table behind background jobs."""
+    db.session.execute(text("""CREATE TABLE IF NOT EXISTS job (
+        id INTEGER NOT NULL,
+        kind VARCHAR(30) NOT NULL,
+        params TEXT NOT NULL,
+        status VARCHAR(10) NOT NULL,
+        progress INTEGER NOT NULL,
+        total INTEGER,
+        message VARCHAR(200),
+        result TEXT,
+        created_at DATETIME,
+        started_at DATETIME,
+        finished_at DATETIME,
+        PRIMARY KEY (id)
+    )"""))
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_job_status ON job (status)"))
+
+def migrate_sort_keys():
+    """Fill NULL Task.is_completed and index clients by status for id-ordered pages."""
+    # keyset_page() needs is_completed NOT NULL to seek ix_task_completed_due;
+    # a task with no state has always been shown as open
+    db.session.execute(text("UPDATE task SET is_completed = 0 WHERE is_completed IS NULL"))
+    db.session.execute(text("DROP INDEX IF EXISTS ix_client_status_created"))
+    db.session.execute(text("DROP INDEX IF EXISTS ix_client_created"))
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_client_status ON client (status)"))
+
+def migrate_filter_indexes():
+    """Index the ?status= and ?category= list filters in page order."""
+    # /sales?status= pages by id and /workbench?category= by state then due
+    # date; without the sort columns in the index SQLite walks every row
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_sale_status_id ON sale (status, id)"))
+    db.session.execute(text("DROP INDEX IF EXISTS ix_task_category"))
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_task_category_due "
+                            "ON task (category, is_completed, due_date)"))
+
+def migrate_unlinked_index():
+    """Index sales by client in id order for the ?client=none page."""
+    # ix_sale_client_date finds unlinked sales but not newest first, so each
+    # page sorted all of them; an import with no clients leaves every row so
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_sale_client_id ON sale (client_id, id)"))
+
+MIGRATIONS = [
+    migrate_create_tables,
+    migrate_date_columns,
+    migrate_revenue_rollup,
+    migrate_seed_data,
+    migrate_sale_client_id,
+    migrate_search_index,
+    migrate_job_table,
+    migrate_sort_keys,
+    migrate_filter_indexes,
+    migrate_unlinked_index,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def schema_version():
+    return db.session.execute(text("PRAGMA user_version")).scalar()
+
+def migrate_schema():
+    """Apply pending MIGRATIONS; returns the version the database started at."""
+    version = schema_version()
+    if version == SCHEMA_VERSION:
+        db.session.rollback()
+        return version
+    # pysqlite only opens transactions before DML, so BEGIN explicitly to
+    # cover the DDL too; IMMEDIATE keeps a second instance from migrating
+    # the same file concurrently.
+    db.session.rollback()
+    db.session.execute(text("BEGIN IMMEDIATE"))
+    version = schema_version()  # re-read under the write lock
+    if version > SCHEMA_VERSION:
+        db.session.rollback()
+        raise SystemExit(f"agency.db is at schema version {version}, newer than this "
+                         f"app ({SCHEMA_VERSION}); upgrade AgencyOS to open it.")
+    try:
+        for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+            print(f"Migration {number}/{SCHEMA_VERSION}: {step.__doc__.splitlines()[0]}")
+            step()
+            db.session.flush()
+        db.session.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return version
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations to agency.db."""
+    start = migrate_schema()
+    print(f"Schema version {start} -> {SCHEMA_VERSION}.")
+
+# ==========================================
+# INITIALIZATION HELPERS (for desktop + dev)
+# ==========================================
 def init_db():
-    """Create/repair schema and seed initial data."""
+    """Bring the schema up to date, seed a fresh database and resume jobs.
+
+    Only the migration check blocks startup (one PRAGMA once the schema is
+    current); jobs interrupted by the last shutdown restart on the job
+    runner's threads.
+    """
     with app.app_context():
-        try:
-            db.create_all()
-            Financial.query.first()
-            Client.query.first()
-        except OperationalError:
-            print("Schema mismatch (adding new tables). Rebuilding...")
-            db.drop_all()
-            db.create_all()
-
-        if Financial.query.count() != 6:
-            seed_financials_dynamically()
-
-        if Task.query.count() == 0:
-            task_seeds = [
-                Task(title="Q3 Strategy Call", category="Meeting", due_date="2023-11-01"),
-                Task(title="Deliver Mockups", category="Delivery", due_date="2023-11-05"),
-            ]
-            db.session.add_all(task_seeds)
-            db.session.commit()
-
-def run_flask():
-    """Initialize DB and run the Flask server (for desktop wrapper or dev)."""
-    init_db()
-    app.run(
-        host="127.0.0.1",
-        port=5000,
-        debug=False
+        migrate_schema()
+        resume_jobs()
+
+def precompile_templates():
+    """Compile every template and hash every static asset before serving.
+
+    Templates otherwise compile lazily on first render, so the first visit
+    to each page pays for it. Compiled bytecode is also persisted next to
+    the database (next to the EXE when packaged; AGENCY_TEMPLATE_CACHE
+    overrides the folder, empty disables it), so later launches skip the
+    Jinja compiler entirely.
+    """
+    cache_dir = os.environ.get('AGENCY_TEMPLATE_CACHE', os.path.join(basedir, '.jinja_cache'))
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache(cache_dir)
+    for name in app.jinja_loader.list_templates():
+        app.jinja_env.get_template(name)
+
+    for root, _, files in os.walk(STATIC_DIR):
+        for name in files:
+            if not name.endswith(tuple(suffix for _, suffix in PRECOMPRESSED)):
+                rel = os.path.relpath(os.path.join(root, name), STATIC_DIR)
+                asset_hash(rel.replace(os.sep, '/'))
+
+WARM_UP_PAGES = ('/', '/dashboard', '/workbench', '/clients', '/sales')
+
+def warm_up():
+    """Precompile templates, then request each read-only page once.
+
+    The requests prime SQLAlchemy's compiled-statement cache and Flask's
+    per-endpoint setup, so the first real page view runs at steady-state
+    speed.
+    """
+    precompile_templates()
+    client = app.test_client()
+    for url in WARM_UP_PAGES:
+        client.get(url)
+
+def serve_production(host, port, threads):
+    """Serve the app with Waitress, a pure-Python production WSGI server.
+
+    Uses a fixed pool of worker threads, keeps HTTP/1.1 connections alive
+    between requests, and on Ctrl+C / SIGTERM stops accepting connections
+    and gives in-flight requests a few seconds to finish.
+    """
+    try:
+        from waitress import create_server
+    except ImportError:
+        raise SystemExit("Production mode needs Waitress: pip install waitress")
+
+    server = create_server(
+        app,
+        host=host,
+        port=port,
+        threads=threads,
+        connection_limit=int(os.environ.get('AGENCY_CONNECTION_LIMIT', 100)),
+        channel_timeout=int(os.environ.get('AGENCY_KEEPALIVE_TIMEOUT', 120)),
+        ident='AgencyOS',
     )
 
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    # Signal handlers can only be installed from the main thread
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, stop)
+
+    print(f"Serving AgencyOS on http://{host}:{port} with {threads} threads (Waitress)")
+    try:
+        server.run()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.close()
+
+def bind_local_socket(host, port):
+    """Listen on `port`, or on a free port picked by the OS if it is taken."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind((host, port))
+    except OSError:
+        sock.bind((host, 0))
+    sock.listen(128)
+    return sock
+
+def serve_when_ready(host, port, ready):
+    """Bind first, then initialize, then call `ready(url)` and serve.
+
+    Used by the desktop wrapper: the port is claimed before the slow
+    init_db()/warm_up() step, and the window is only pointed at the app
+    once every page can be served.
+    """
+    from werkzeug.serving import make_server
+
+    sock = bind_local_socket(host, port)
+    httpd = make_server(host, sock.getsockname()[1], app, threaded=True, fd=sock.fileno())
+    sock.close()  # make_server holds its own duplicate of the descriptor
+    init_db()
+    warm_up()
+    ready(f"http://{host}:{httpd.port}/")
+    httpd.serve_forever()
+
+def run_flask(server=None, host=None, port=None, threads=None, ready=None):
+    """Initialize DB and run the Flask server (for desktop wrapper or dev).
+
+    With no arguments this reads AGENCY_SERVER ('dev' or 'production'),
+    AGENCY_HOST, AGENCY_PORT and AGENCY_THREADS, defaulting to the Werkzeug
+    development server on 127.0.0.1:5000. Passing `ready` switches to
+    serve_when_ready(), which falls back to a free port and reports the URL.
+    """
+    server = server or os.environ.get('AGENCY_SERVER', 'dev')
+    host = host or os.environ.get('AGENCY_HOST', '127.0.0.1')
+    port = port or int(os.environ.get('AGENCY_PORT', 5000))
+    threads = threads or int(os.environ.get('AGENCY_THREADS', 8))
+
+    if ready is not None:
+        serve_when_ready(host, port, ready)
+        return
+
+    init_db()
+    warm_up()
+    if server == 'production':
+        serve_production(host, port, threads)
+    else:
+        app.run(
+            host=host,
+            port=port,
+            debug=False
+        )
+
 if __name__ == '__main__':
-    # Development mode: run with Python directly
-    run_flask()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the AgencyOS server.")
+    parser.add_argument('--server', choices=['dev', 'production'],
+                        help="'production' serves through Waitress (env: AGENCY_SERVER)")
+    parser.add_argument('--host', help="bind address, e.g. 0.0.0.0 for LAN access (env: AGENCY_HOST)")
+    parser.add_argument('--port', type=int, help="port to listen on (env: AGENCY_PORT)")
+    parser.add_argument('--threads', type=int, help="worker threads in production mode (env: AGENCY_THREADS)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="serve request/SQL metrics at /metrics for local scrapes (env: AGENCY_METRICS=1)")
+    args = parser.parse_args()
+    if args.metrics:
+        enable_metrics()
+    run_flask(server=args.server, host=args.host, port=args.port, threads=args.threads)
@@ -0,0 +1,632 @@
+"""
+Dashboard latency benchmark.
+
+Seeds a throwaway SQLite database with synthetic sales and times the
+dashboard route for every timeframe through the Flask test client.
+
+Usage:
+    python benchmark.py                 # 10k, 100k and 1M sales rows
+    python benchmark.py 50000 --repeat 5
+    python benchmark.py 10000 --explain # fail on un-indexed filtered queries
+    python benchmark.py 100000 --concurrency  # read/write throughput per SQLite profile
+    python benchmark.py --cold-start    # first-page latency after launch
+    python benchmark.py --import-time   # `python -X importtime` report for app.py
+    python benchmark.py 3000 --jobs     # fail if Optimize reclaims nothing after a bulk delete
+    python benchmark.py 1000 100000 --suite --json before.json
+                                        # every route on synthetic clients/sales/tasks:
+                                        # p50/p95 ms, queries, ORM rows, peak memory
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TIMEFRAMES = ['1m', '3m', '6m', '1y', 'all']
+ROUTES = ['/dashboard?timeframe=' + tf for tf in TIMEFRAMES] + [
+    '/workbench', '/clients', '/clients/1', '/sales', '/search?q=client+1+seo',
+    # the filters each list page offers, alone and combined
+    '/workbench?state=done', '/workbench?state=pending', '/workbench?category=Meeting',
+    '/workbench?category=Meeting&state=done', '/workbench?q=client&category=Delivery',
+    '/clients?status=Active', '/clients?q=client+1', '/clients?q=client&status=Lead',
+    '/sales?status=Closed%20Won', '/sales?status=In%20Progress&after=100',
+    '/sales?client=none', '/sales?q=seo&status=Closed%20Lost',
+    '/search?q=cli', '/search?q=seo+package', '/search?q=%22web+build%22']
+STATUSES = ['In Progress', 'Closed Won', 'Closed Lost']
+CLIENT_STATUSES = ['Lead', 'Active', 'Churned']
+SERVICES = ["SEO Package", "Web Build", "Retainer", "Ads"]
+CATEGORIES = ["Meeting", "Delivery", "Outreach", "Admin", "Strategy"]
+
+
+def seed_sales(db_path, rows, seed=42):
+    """Bulk insert `rows` deterministic sales spread over the last 5 years."""
+    rng = random.Random(seed)
+    today = datetime.today()
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM sale")
+    batch = []
+    for i in range(rows):
+        day = today - timedelta(days=rng.randint(0, 5 * 365))
+        batch.append((
+            f"Client {rng.randint(1, 2000)}",
+            rng.choice(SERVICES),
+            round(rng.uniform(100, 20000), 2),
+            rng.choice(STATUSES),
+            day.strftime('%Y-%m-%d'),
+        ))
+        if len(batch) == 50000:
+            conn.executemany(
+                "INSERT INTO sale (client_name, service, amount, status, date) VALUES (?, ?, ?, ?, ?)",
+                batch,
+            )
+            batch = []
+    if batch:
+        conn.executemany(
+            "INSERT INTO sale (client_name, service, amount, status, date) VALUES (?, ?, ?, ?, ?)",
+            batch,
+        )
+    conn.commit()
+    conn.close()
+
+
+def insert_batches(conn, sql, rows, batch_size=50000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            conn.executemany(sql, batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def seed_dataset(db_path, sales, seed=42):
+    """Replace clients, sales and tasks with a deterministic synthetic set.
+
+    `sales` sets the scale; there is one client per 20 sales and one task
+    per 10 (at least 10 of each). Every sale belongs to a client, as
+    add_sale would link it. Dates fall within 5 years of today, so the same
+    seed gives the same rows relative to the dashboard's windows. Returns
+    the row counts.
+    """
+    rng = random.Random(seed)
+    now = datetime.today()
+    counts = {'clients': max(sales // 20, 10), 'sales': sales, 'tasks': max(sales // 10, 10)}
+    conn = sqlite3.connect(db_path)
+    for table in ('sale', 'client', 'task'):
+        conn.execute(f"DELETE FROM {table}")
+
+    def timestamp(days):
+        return (now - timedelta(days=days, seconds=rng.randint(0, 86399))).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+    insert_batches(conn, "INSERT INTO client (id, name, company, email, status, created_at) VALUES (?, ?, ?, ?, ?, ?)", (
+        (i, f"Client {i}", f"Company {i % 997}", f"client{i}@example.com",
+         rng.choice(CLIENT_STATUSES), timestamp(rng.randint(0, 5 * 365)))
+        for i in range(1, counts['clients'] + 1)))
+
+    def sale_row():
+        client_id = rng.randint(1, counts['clients'])
+        day = now - timedelta(days=rng.randint(0, 5 * 365))
+        return (client_id, f"Client {client_id}", rng.choice(SERVICES), round(rng.uniform(100, 20000), 2),
+                rng.choice(STATUSES), day.strftime('%Y-%m-%d'))
+
+    insert_batches(conn, "INSERT INTO sale (client_id, client_name, service, amount, status, date) VALUES (?, ?, ?, ?, ?, ?)",
+                   (sale_row() for _ in range(sales)))
+
+    def task_row(i):
+        due = now + timedelta(days=rng.randint(-365, 90))
+        return (f"Task {i}", rng.choice(CATEGORIES), due.strftime('%Y-%m-%d'),
+                int(rng.random() < 0.6), timestamp(rng.randint(0, 400)))
+
+    insert_batches(conn, "INSERT INTO task (title, category, due_date, is_completed, created_at) VALUES (?, ?, ?, ?, ?)",
+                   (task_row(i) for i in range(counts['tasks'])))
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return counts
+
+
+def suite_routes(counts):
+    """Every GET route, the three add forms and bulk-complete.
+
+    Reads come first; the writes go last so they cannot skew the reads.
+    Left out are the writes that only do work once, so repeats would time a
+    no-op: bulk deletes, imports, starting jobs, quarantine restore/discard
+    (and /jobs/<id>/download, /api/jobs/<id>, which need a finished job).
+    Returns (method, url, form) triples.
+    """
+    middle = counts['clients'] // 2
+    reads = ['/'] + ['/dashboard?timeframe=' + tf for tf in TIMEFRAMES] + [
+        '/api/dashboard', '/api/cache_stats',
+        '/workbench', '/workbench?state=pending', '/workbench?state=done', '/workbench?q=Task%201',
+        '/workbench?category=Meeting',
+        '/clients', '/clients?status=Active', '/clients?q=Client%201', f'/clients/{middle}',
+        '/sales', '/sales?status=Closed%20Won', f'/sales?q=Client%20{middle}',
+        '/api/client_names?q=Client%201',
+        '/workbench?limit=all', '/clients?limit=all', '/sales?limit=all',
+        '/search?q=seo', f'/search?q=client+{middle}', f'/api/search?q=client+{middle}+ads',
+        '/api/search?q=task+1', '/api/search?q=nomatch',
+        '/jobs', '/api/jobs', '/quarantine', '/metrics',
+        '/export/clients.csv', '/export/sales.csv', '/export/tasks.json',
+        '/static/vendor/bootstrap/bootstrap.min.css', '/static/vendor/chart.js/chart.umd.js',
+    ]
+    today = datetime.today().strftime('%Y-%m-%d')
+    writes = [
+        ('/add_task', {'title': 'bench task', 'category': 'Admin', 'due_date': today}),
+        ('/add_client', {'name': 'Bench Client', 'company': 'Bench', 'email': 'b@example.com', 'status': 'Lead'}),
+        ('/add_sale', {'client_name': f'Client {middle}', 'service': 'Ads', 'amount': '1200',
+                       'date': today, 'status': 'Closed Won'}),
+        # a page's worth of checkboxes; completing is idempotent, so every repeat does the same work
+        ('/bulk/tasks', {'action': 'complete', 'ids': [str(i) for i in range(1, 51)]}),
+    ]
+    return [('GET', url, None) for url in reads] + [('POST', url, form) for url, form in writes]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+
+
+def run_suite(agency, client, counts, repeat, cached):
+    """Time each suite route `repeat` times, then once more under tracemalloc.
+
+    Returns {'METHOD url': {...}} with p50/p95 latency and p50 time to the
+    first body chunk in ms, SQL statements and ORM instances loaded per
+    request, and the request's peak Python allocation in KiB (tracemalloc,
+    measured apart from the timed runs). Bodies are consumed chunk by chunk
+    and discarded, as a socket would, so streamed pages are not buffered.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.orm import Session
+
+    tally = {'queries': 0, 'rows': 0}
+
+    def count_query(*args):
+        tally['queries'] += 1
+
+    def count_row(*args):
+        tally['rows'] += 1
+
+    def request(method, url, form):
+        """Returns (status, ms to the first body chunk)."""
+        start = time.perf_counter()
+        resp = client.open(url, method=method, data=form, buffered=False)
+        first = None
+        for _ in resp.response:
+            if first is None:
+                first = (time.perf_counter() - start) * 1000
+        resp.close()
+        assert resp.status_code in (200, 302), (url, resp.status_code)
+        return resp.status_code, first or 0.0
+
+    results = {}
+    event.listen(Engine, 'before_cursor_execute', count_query)
+    event.listen(Session, 'loaded_as_persistent', count_row)
+    try:
+        for method, url, form in suite_routes(counts):
+            samples = []
+            first_bytes = []
+            for _ in range(repeat):
+                if not cached:
+                    agency.bump_data_version()
+                tally.update(queries=0, rows=0)
+                start = time.perf_counter()
+                status, first_byte = request(method, url, form)
+                samples.append((time.perf_counter() - start) * 1000)
+                first_bytes.append(first_byte)
+
+            if not cached:
+                agency.bump_data_version()
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            request(method, url, form)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            tracemalloc.stop()
+
+            results[f"{method} {url}"] = {
+                'status': status,
+                'p50_ms': round(percentile(samples, 50), 3),
+                'p95_ms': round(percentile(samples, 95), 3),
+                'ttfb_ms': round(percentile(first_bytes, 50), 3),
+                'queries': tally['queries'],
+                'orm_rows': tally['rows'],
+                'peak_kib': round(peak / 1024, 1),
+            }
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count_query)
+        event.remove(Session, 'loaded_as_persistent', count_row)
+    return results
+
+
+def suite_metadata(repeat, seed, cached, metrics):
+    """Where the numbers came from, so runs from different commits line up."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=HERE,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'seed': seed,
+        'cached': cached,
+        'metrics': metrics,
+    }
+
+
+def time_route(client, url, repeat, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        resp = client.get(url)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert resp.status_code == 200, (url, resp.status_code)
+    return statistics.median(samples)
+
+
+def explain_routes(agency, client):
+    """Run EXPLAIN QUERY PLAN on every SELECT the routes issue.
+
+    Returns a list of (route, sql, plan) for filtered queries that walk a
+    whole table or index (SCAN ...), or that sort every match to return one
+    page (USE TEMP B-TREE FOR ORDER BY under a LIMIT). Allowed: unfiltered
+    listings, FTS5 lookups and their bm25 sort (an index by design), scans
+    of a subquery, and the `?q=` substring filter, which no B-tree can serve
+    and which walks in page order until the page is full.
+    """
+    from sqlalchemy import event
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    failures = []
+    with agency.app.app_context():
+        engine = agency.db.engine
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            for url in ROUTES:
+                captured.clear()
+                client.get(url)
+                statements = list(captured)
+                captured.clear()
+                with engine.connect() as conn:
+                    for sql, params in statements:
+                        plan = [row[-1] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, params)]
+                        words = ' '.join(sql.split()).upper()
+                        fts = any('VIRTUAL TABLE' in step for step in plan)
+                        subqueries = {step.split()[-1] for step in plan
+                                      if step.startswith(('CO-ROUTINE', 'MATERIALIZE'))}
+                        full_scan = any(step.startswith('SCAN') and 'VIRTUAL TABLE' not in step
+                                        and step.split()[1] not in subqueries for step in plan)
+                        full_sort = ' LIMIT ' in words and not fts and any(
+                            step.startswith('USE TEMP B-TREE FOR ORDER BY') for step in plan)
+                        substring = "LIKE '%' ||" in words and not full_sort
+                        filtered = ' WHERE ' in words
+                        if (full_scan and not substring or full_sort) and filtered:
+                            print(f"FAIL {url}\n     {' '.join(sql.split())}\n     -> {'; '.join(plan)}")
+                            failures.append((url, sql, plan))
+                print(f"checked {len(statements):>2} queries  {url}")
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+    return failures
+
+
+def concurrent_throughput(agency, seconds, readers, writers):
+    """Hammer list pages and add_task from several threads; return ops/sec."""
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def worker(kind):
+        client = agency.app.test_client()
+        ok = 0
+        errors = 0
+        n = 0
+        while time.perf_counter() < stop:
+            n += 1
+            try:
+                if kind == 'reads':
+                    resp = client.get('/sales?limit=50' if n % 2 else '/workbench?limit=50')
+                    good = resp.status_code == 200
+                else:
+                    resp = client.post('/add_task', data={
+                        'title': f'bench {n}', 'category': 'Admin', 'due_date': '2024-01-01'})
+                    good = resp.status_code == 302
+            except Exception:
+                good = False
+            if good:
+                ok += 1
+            else:
+                errors += 1
+        with lock:
+            counts[kind] += ok
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=('reads',)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=('writes',)) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def run_job(client, kind, timeout=120):
+    """POST /jobs/<kind> and poll /api/jobs/<id> until it ends; returns the job."""
+    job = client.post(f'/jobs/{kind}').get_json()
+    stop = time.perf_counter() + timeout
+    while job['status'] in ('queued', 'running'):
+        if time.perf_counter() > stop:
+            raise TimeoutError(f"{kind} job still {job['status']} after {timeout} s")
+        time.sleep(0.05)
+        job = client.get(f"/api/jobs/{job['id']}").get_json()
+    return job
+
+
+def check_optimize(agency, client, db_path, rows):
+    """Delete 90% of `rows` sales through /bulk/sales, then run Optimize.
+
+    Returns a failure message, or None if the job reports bytes reclaimed.
+    """
+    seed_dataset(db_path, rows)
+    conn = sqlite3.connect(db_path)
+    ids = [row[0] for row in conn.execute("SELECT id FROM sale WHERE id % 10 != 0")]
+    conn.close()
+    batch = 1000  # BULK_IDS_MAX
+    for start in range(0, len(ids), batch):
+        resp = client.post('/bulk/sales', data={'action': 'delete', 'ids': ids[start:start + batch]})
+        assert resp.status_code == 302, resp.status_code
+    job = run_job(client, 'optimize')
+    if job['status'] != 'done':
+        return f"optimize {job['status']}: {job['message']}"
+    before, after = job['result']['bytes_before'], job['result']['bytes_after']
+    print(f"{before:>12,} -> {after:>12,} bytes  ({job['message']})")
+    if before - after <= 0:
+        return f"deleting {len(ids)} sales reclaimed {before - after} bytes"
+    return None
+
+
+COLD_START_PAGES = ['/', '/dashboard', '/workbench', '/clients', '/sales']
+
+# Runs in a fresh interpreter so nothing is compiled or imported yet
+COLD_START_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import app as agency
+agency.init_db()
+if sys.argv[2] != '0':
+    agency.warm_up() if sys.argv[2] == '2' else agency.precompile_templates()
+ready = time.perf_counter()
+client = agency.app.test_client()
+
+def timed(url):
+    agency.bump_data_version()
+    start = time.perf_counter()
+    client.get(url)
+    return (time.perf_counter() - start) * 1000
+
+first = sum(timed(url) for url in json.loads(sys.argv[3]))
+steady = min(sum(timed(url) for url in json.loads(sys.argv[3])) for _ in range(5))
+print(json.dumps({'startup': (ready - t0) * 1000, 'first': first, 'steady': steady}))
+"""
+
+
+def cold_start(workdir, mode, template_cache):
+    """mode 0: lazy, 1: precompile_templates(), 2: warm_up()."""
+    env = dict(os.environ, AGENCY_TEMPLATE_CACHE=template_cache)
+    out = subprocess.run(
+        [sys.executable, '-c', COLD_START_SCRIPT, HERE, str(mode),
+         json.dumps(COLD_START_PAGES)],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_time(workdir):
+    """Import app.py under `-X importtime` in a fresh interpreter.
+
+    Returns (total_us, {module: cumulative_us}) for the modules app.py
+    itself pulls in first, i.e. the direct children of `app` in the tree.
+    """
+    err = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import sys; sys.path.insert(0, {HERE!r}); import app'],
+        cwd=workdir, capture_output=True, text=True, check=True,
+    ).stderr
+    children = {}
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if depth == 0:
+            if name == 'app':
+                return int(cumulative), children
+            children = {}
+        elif depth == 1:
+            children[name] = int(cumulative)
+    raise RuntimeError('app was not imported')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('rows', nargs='*', type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cached', action='store_true',
+                        help='time warm dashboard cache hits instead of full recomputes')
+    parser.add_argument('--concurrency', action='store_true',
+                        help='measure concurrent read/write throughput for each SQLite profile')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--cold-start', action='store_true',
+                        help='time the first render of every page in a fresh process')
+    parser.add_argument('--import-time', action='store_true',
+                        help='report what importing app.py costs, module by module')
+    parser.add_argument('--explain', action='store_true',
+                        help='check query plans for full table scans instead of timing')
+    parser.add_argument('--jobs', action='store_true',
+                        help='check that the Optimize job reclaims space, for each SQLite profile')
+    parser.add_argument('--suite', action='store_true',
+                        help='seed synthetic clients/sales/tasks and time every route')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for --suite data')
+    parser.add_argument('--json', metavar='PATH',
+                        help="write --suite results as JSON to PATH ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    # With `--json -` the report owns stdout; progress and app output go to stderr
+    report_out = sys.stdout
+    if args.json == '-':
+        sys.stdout = sys.stderr
+    elif args.json:
+        args.json = os.path.abspath(args.json)  # before run() moves into the scratch dir
+
+    # app.py places agency.db in the working directory, so import it from a
+    # scratch directory to keep the real database untouched.
+    workdir = tempfile.mkdtemp(prefix='agency-bench-')
+    cwd = os.getcwd()
+    try:
+        return run(args, workdir, report_out)
+    finally:
+        os.chdir(cwd)
+        if 'app' in sys.modules:
+            with sys.modules['app'].app.app_context():
+                sys.modules['app'].db.engine.dispose()  # close the files so Windows can delete them
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(args, workdir, report_out):
+    if args.import_time:
+        runs = [import_time(workdir) for _ in range(max(args.repeat, 5))]
+        total = statistics.median(r[0] for r in runs)
+        modules = {name: statistics.median(r[1].get(name, 0) for r in runs) for name in runs[0][1]}
+        print(f"import app: {total / 1000:.1f} ms (median of {len(runs)})")
+        for name, us in sorted(modules.items(), key=lambda kv: -kv[1])[:12]:
+            print(f"{us / 1000:>9.1f} ms  {name}")
+        return 0
+
+    if args.cold_start:
+        bytecode_dir = os.path.join(workdir, 'jinja-cache')
+        scenarios = [
+            ('lazy compile', 0, ''),
+            ('precompile, cold bytecode', 1, bytecode_dir),
+            ('precompile, warm bytecode', 1, bytecode_dir),
+            ('warm_up(), warm bytecode', 2, bytecode_dir),
+        ]
+        print(f"{'scenario':>28} {'startup':>9} {'1st pages':>10} {'steady':>8}   (ms, {len(COLD_START_PAGES)} pages)")
+        for label, mode, cache in scenarios:
+            runs = [cold_start(workdir, mode, cache) for _ in range(args.repeat)]
+            med = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+            print(f"{label:>28} {med['startup']:>9.1f} {med['first']:>10.1f} {med['steady']:>8.1f}")
+        return 0
+
+    os.chdir(workdir)
+    sys.path.insert(0, HERE)
+    import app as agency
+
+    agency.init_db()
+    client = agency.app.test_client()
+    db_path = os.path.join(workdir, 'agency.db')
+
+    if args.suite:
+        repeat = max(args.repeat, 20)  # enough samples for a p95
+        # /metrics is part of the suite, so every route runs with its hooks on,
+        # as it does in a deployment that is scraped
+        agency.enable_metrics()
+        report = {'meta': suite_metadata(repeat, args.seed, args.cached, metrics=True), 'datasets': []}
+        for rows in args.rows:
+            counts = seed_dataset(db_path, rows, args.seed)
+            with agency.app.app_context():
+                agency.rebuild_revenue_rollup()  # rows were inserted behind the app's back
+            agency.bump_data_version()
+            client.get('/dashboard')  # warm up templates and connections
+            routes = run_suite(agency, client, counts, repeat, args.cached)
+            report['datasets'].append({'rows': counts, 'routes': routes})
+            print(f"\n{counts['clients']} clients, {counts['sales']} sales, {counts['tasks']} tasks")
+            print(f"{'route':<48} {'p50 ms':>9} {'p95 ms':>9} {'ttfb ms':>9} {'queries':>8} {'rows':>6} {'peak KiB':>9}")
+            for route, r in routes.items():
+                print(f"{route:<48} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['ttfb_ms']:>9.1f} {r['queries']:>8} "
+                      f"{r['orm_rows']:>6} {r['peak_kib']:>9.1f}")
+        if args.json == '-':
+            json.dump(report, report_out, indent=2)
+            report_out.write('\n')
+        elif args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"\nWrote {args.json}")
+        return 0
+
+    if args.explain:
+        seed_sales(db_path, args.rows[0])
+        with agency.app.app_context():
+            # One client so /clients/1 exercises the client_id join
+            agency.db.session.add(agency.Client(name='Client 1', status='Active'))
+            agency.link_sales_to_clients()
+            agency.db.session.commit()
+            agency.rebuild_revenue_rollup()
+        failures = explain_routes(agency, client)
+        print(f"{len(failures)} filtered queries without an index")
+        return 1 if failures else 0
+
+    if args.jobs:
+        failures = 0
+        for profile in agency.SQLITE_PROFILES:
+            agency.app.config['SQLITE_PROFILE'] = profile
+            with agency.app.app_context():
+                agency.db.engine.dispose()  # reconnect so the new pragmas apply
+            print(f"{profile:>12} ", end='', flush=True)
+            failure = check_optimize(agency, client, db_path, args.rows[0])
+            if failure:
+                print(f"FAIL {profile}: {failure}")
+                failures += 1
+        return 1 if failures else 0
+
+    if args.concurrency:
+        seed_sales(db_path, args.rows[0])
+        print(f"{'profile':>12} {'reads/s':>9} {'writes/s':>9} {'errors/s':>9}   (4 readers, 2 writers)")
+        for profile in agency.SQLITE_PROFILES:
+            agency.app.config['SQLITE_PROFILE'] = profile
+            with agency.app.app_context():
+                agency.db.engine.dispose()  # reconnect so the new pragmas apply
+            result = concurrent_throughput(agency, args.seconds, readers=4, writers=2)
+            print(f"{profile:>12} {result['reads']:>9.1f} {result['writes']:>9.1f} {result['errors']:>9.1f}")
+        return 0
+
+    print(f"{'rows':>10} " + " ".join(f"{tf:>9}" for tf in TIMEFRAMES) + "   (median ms)")
+    for rows in args.rows:
+        seed_sales(db_path, rows)
+        client.get('/dashboard')  # warm up templates and connections
+        with agency.app.app_context():
+            agency.rebuild_revenue_rollup()  # rows were inserted behind the app's back
+        before = None if args.cached else agency.bump_data_version
+        timings = [time_route(client, f'/dashboard?timeframe={tf}', args.repeat, before) for tf in TIMEFRAMES]
+        print(f"{rows:>10} " + " ".join(f"{t:>9.1f}" for t in timings))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
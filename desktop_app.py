@@ -1,19 +1,96 @@
+import html
+import os
 import threading
+import time
 import webview
+from datetime import datetime
 
-from app import run_flask  # import the function from app.py
+TITLE = "AgencyOS | Owner Tracker"
 
+# The packaged app has no console, so startup timings are also appended
+# here, next to agency.db (both live in the working directory)
+STARTUP_LOG = os.path.join(os.path.abspath(os.getcwd()), 'startup.log')
 
-def start_server():
-    # Run the Flask app (this also initializes the DB)
-    run_flask()
+# Shown instantly while the server binds, migrates and warms up. Plain
+# inline HTML so it paints without waiting for the server or any asset.
+SPLASH_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><style>
+  body { margin: 0; height: 100vh; display: flex; align-items: center; justify-content: center;
+         background: #f8f9fa; font-family: system-ui, sans-serif; color: #212529; }
+  .box { text-align: center; }
+  .spinner { width: 36px; height: 36px; margin: 0 auto 16px; border: 4px solid #dee2e6;
+             border-top-color: #0d6efd; border-radius: 50%; animation: spin .8s linear infinite; }
+  @keyframes spin { to { transform: rotate(360deg); } }
+</style></head>
+<body><div class="box"><div class="spinner"></div><h5>AgencyOS</h5><small>Starting up&hellip;</small></div></body></html>
+"""
+
+ERROR_HTML = """<!DOCTYPE html>
+<html><body style="font-family: system-ui, sans-serif; padding: 2rem;">
+<h4>AgencyOS failed to start</h4><pre>{error}</pre></body></html>
+"""
+
+
+class StartupTimer:
+    """Records time-to-first-paint milestones from process start."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.start) * 1000
+
+    def report(self):
+        line = "Startup: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.marks.items())
+        print(line)
+        try:
+            with open(STARTUP_LOG, 'a', encoding='utf-8') as log:
+                log.write(f"{datetime.now():%Y-%m-%d %H:%M:%S} {line}\n")
+        except OSError:
+            pass  # a read-only folder must not stop the app
+
+
+def start_server(window, timer):
+    """Run Flask in the background and point the window at it once ready."""
+    def ready(url):
+        timer.mark("server ready")
+        window.load_url(url)
+
+    try:
+        # Imported here rather than at the top so the splash is on screen while
+        # Flask, SQLAlchemy and the models load (the bulk of launch time).
+        from app import run_flask
+
+        # Binds 127.0.0.1:5000 (or a free port if taken), initializes the DB,
+        # then calls ready() with the real URL and serves.
+        run_flask(host="127.0.0.1", port=5000, ready=ready)
+    except (Exception, SystemExit) as exc:
+        # init_db raises SystemExit when agency.db is newer than this build;
+        # in a worker thread that would just end the thread and leave the
+        # splash spinning, so show its message like any other failure.
+        window.load_html(ERROR_HTML.format(error=html.escape(str(exc))))
 
 
 if __name__ == "__main__":
+    timer = StartupTimer()
+
+    # Create the native window with the splash; the app URL comes later
+    window = webview.create_window(TITLE, html=SPLASH_HTML)
+
+    def on_loaded():
+        # Fires once for the splash, then again for the first app page
+        if "splash painted" not in timer.marks:
+            timer.mark("splash painted")
+        elif "app painted" not in timer.marks:
+            timer.mark("app painted")
+            timer.report()
+
+    window.events.loaded += on_loaded
+
     # Start Flask in a background thread
-    server_thread = threading.Thread(target=start_server, daemon=True)
+    server_thread = threading.Thread(target=start_server, args=(window, timer), daemon=True)
     server_thread.start()
 
-    # Create native desktop window pointing to local server
-    webview.create_window("AgencyOS | Owner Tracker", "http://127.0.0.1:5000")
     webview.start()